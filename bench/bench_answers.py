@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+MABP Answer Parser Benchmark
+Times answer extraction over the same replies two ways and checks the
+letters agree on every one:
+
+  legacy    game_classifier's original four-regex parse_letter, plus a
+            per-text findall for Q/S answer sheets
+  engine    dataset.answers.parse_batch (one anchored letter pattern, one
+            sheet pattern)
+
+The corpus is the synthetic account from moltbook/fake_server.py (letters,
+sheets and free text, as the game posts receive them) plus the real dataset
+responses.
+
+Usage:
+  python3 bench/bench_answers.py
+  python3 bench/bench_answers.py --posts 2000 --comments 50 --repeat 5
+"""
+import argparse, re, sys, time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from dataset import CombinedLog
+from dataset.answers import parse_batch
+from moltbook.fake_server import SyntheticStore
+
+
+def legacy_letter(text):
+    text = text.strip()
+    if re.match(r'^[abcdeABCDE][\.\s\-—:!]?$', text):
+        return text[0].lower()
+    m = re.match(r'^([abcdeABCDE])[\s\.\-—:]', text)
+    if m:
+        return m.group(1).lower()
+    m = re.search(r'\b(?:answer is|choose|pick|going with|option|letter)\s+([abcdeABCDE])\b', text, re.I)
+    if m:
+        return m.group(1).lower()
+    m = re.search(r'[\*\"`]([abcdeABCDE])[\*\"`]', text)
+    if m:
+        return m.group(1).lower()
+    return None
+
+
+def legacy(texts):
+    out = []
+    for text in texts:
+        q = re.findall(r'\bQ(\d{1,2})\s*:\s*([A-Ea-e])\b', text)
+        s = re.findall(r'\bS(\d)\s*[:—-]\s*([A-Ea-e])\b', text)
+        out.append(("sheet", q or s) if len(q) > 1 or len(s) > 1 else ("letter", legacy_letter(text)))
+    return out
+
+
+def engine(texts):
+    return parse_batch(texts)
+
+
+def corpus(n_posts: int, comments: int) -> list[str]:
+    store = SyntheticStore(n_posts, comments, seed=n_posts)
+    texts = [c.get("content", "") for p in store.posts("thefranceway") for c in store.comments(p["id"])]
+    texts += [r.get("content", "") for r in CombinedLog().records()]
+    return texts
+
+
+def timed(fn, texts, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--posts", type=int, default=400)
+    ap.add_argument("--comments", type=int, default=50, help="mean comments per post")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N")
+    args = ap.parse_args()
+
+    texts = corpus(args.posts, args.comments)
+    t_legacy, r_legacy = timed(legacy, texts, args.repeat)
+    t_engine, r_engine = timed(engine, texts, args.repeat)
+
+    formats: dict = {}
+    mismatches = 0
+    for (kind, old), new in zip(r_legacy, r_engine):
+        fmt = new["format"] if new else None
+        formats[fmt] = formats.get(fmt, 0) + 1
+        if kind == "letter" and fmt in ("letter", None):
+            mismatches += old != (new["answer"] if new else None)
+        elif kind != "sheet" or fmt not in ("Q", "S"):
+            mismatches += 1
+
+    print(f"{len(texts)} replies  " + "  ".join(f"{k or 'none'}={v}" for k, v in sorted(formats.items(), key=str)))
+    print(f"{'PARSER':<10} {'SECONDS':>9} {'K/s':>9}")
+    print("─" * 30)
+    print(f"{'legacy':<10} {t_legacy:>9.3f} {len(texts) / t_legacy / 1000:>9.1f}")
+    print(f"{'engine':<10} {t_engine:>9.3f} {len(texts) / t_engine / 1000:>9.1f}   {t_legacy / t_engine:.2f}x")
+    print(f"\n{'All results identical.' if not mismatches else f'{mismatches} MISMATCHES'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
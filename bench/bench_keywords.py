@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+MABP Keyword Matcher Benchmark
+Times the KPI keyword-family detection two ways over the same comments and
+checks they agree on every one:
+
+  loops     the dashboard's original per-family `any(kw in text.lower() ...)`
+  matcher   dataset.keywords.KeywordMatcher (one automaton, one pass)
+
+The corpus is the synthetic account from moltbook/fake_server.py plus the
+real dataset responses, reported per length bucket (the matcher switches
+strategy at keywords.LONG_TEXT characters).
+
+Usage:
+  python3 bench/bench_keywords.py
+  python3 bench/bench_keywords.py --posts 2000 --comments 50 --repeat 5
+"""
+import argparse, sys, time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(REPO_DIR / "dashboard"))
+
+import kpi
+from dataset import CombinedLog
+from dataset.keywords import LONG_TEXT
+from moltbook.fake_server import SyntheticStore
+
+FAMILIES = {
+    "identity":      kpi.IDENTITY_KEYWORDS,
+    "request":       kpi.REQUEST_KEYWORDS,
+    "reflection":    kpi.REFLECTION_KEYWORDS,
+    "contamination": kpi.CONTAMINATION_KEYWORDS,
+    "archetype":     kpi.ARCHETYPE_KEYWORDS,
+    "declaration":   kpi.DECLARATION_KEYWORDS,
+}
+
+
+def loops(texts):
+    out = []
+    for text in texts:
+        content = text.lower()
+        out.append(frozenset(f for f, kws in FAMILIES.items() if any(kw in content for kw in kws)))
+    return out
+
+
+def matcher(texts):
+    return kpi.KEYWORDS.families_batch(texts)
+
+
+def corpus(n_posts: int, comments: int) -> list[str]:
+    store = SyntheticStore(n_posts, comments, seed=n_posts)
+    texts = [c.get("content", "") for p in store.posts("thefranceway") for c in store.comments(p["id"])]
+    texts += [r.get("content", "") for r in CombinedLog().records()]
+    return texts
+
+
+def timed(fn, texts, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--posts", type=int, default=400)
+    ap.add_argument("--comments", type=int, default=50, help="mean comments per post")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N")
+    args = ap.parse_args()
+
+    texts = corpus(args.posts, args.comments)
+    buckets = {
+        f"< {LONG_TEXT} chars":  [t for t in texts if len(t) <= LONG_TEXT],
+        f"> {LONG_TEXT} chars":  [t for t in texts if len(t) > LONG_TEXT],
+        "all":                   texts,
+    }
+    print(f"{'BUCKET':<16} {'TEXTS':>8} {'LOOPS s':>9} {'MATCHER s':>10} {'SPEEDUP':>8} {'K/s':>9}")
+    print("─" * 65)
+    mismatches = 0
+    for name, bucket in buckets.items():
+        if not bucket:
+            continue
+        t_loops, r_loops = timed(loops, bucket, args.repeat)
+        t_match, r_match = timed(matcher, bucket, args.repeat)
+        mismatches += sum(a != b for a, b in zip(r_loops, r_match))
+        print(f"{name:<16} {len(bucket):>8} {t_loops:>9.3f} {t_match:>10.3f} "
+              f"{t_loops / t_match:>7.2f}x {len(bucket) / t_match / 1000:>9.1f}")
+    print(f"\n{'All results identical.' if not mismatches else f'{mismatches} MISMATCHES'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+MABP Pipeline Scale Benchmark
+Runs each polling pipeline against a synthetic account served by the local
+Moltbook stand-in (moltbook/fake_server.py) and records, per run:
+
+  wall time per cycle, peak RSS, API calls made by the client,
+  requests / bytes served by the stub
+
+Each (size, pipeline) runs in its own subprocess against a scratch copy of
+the repo, so state files, the response cache, watermarks and peak RSS are
+isolated and nothing here touches real state or git. Cycle 1 is cold; later
+cycles show what the cache and incremental sync save.
+
+Usage:
+  python3 bench/bench_pipelines.py                          # compare against bench/baseline.json
+  python3 bench/bench_pipelines.py --save                   # write results as the new baseline
+  python3 bench/bench_pipelines.py --sizes 10000 --comments 100   # ~1M comments
+
+bench/baseline.json is committed: a default-parameter --save run, with the
+sizes, comments per post, cycles, repeats and stub latency it was recorded
+at. Each (size, pipeline) keeps the best of --repeat runs (by cold-cycle wall
+time), since single wall-time samples vary by about a quarter on a busy host. Runs
+are compared per pipeline@posts×comments key; a key missing from the
+baseline, or a latency that differs from it, is reported rather than passed
+over silently.
+"""
+import argparse, contextlib, importlib.util, json, os, resource, shutil, subprocess, sys, tempfile, time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+PIPELINES = {
+    "kpi":                  ("dashboard/kpi.py",                "run"),
+    "sync_responses":       ("sync_responses.py",               "check_once"),
+    "game_classifier":      ("campaign/game_classifier.py",     "run_once"),
+    "notification_watcher": ("campaign/notification_watcher.py", "check_once"),
+    "check_and_reply":      ("campaign/check_and_reply.py",     "check_once"),
+}
+
+# Flag a regression when a metric grows by more than this fraction over baseline
+TOLERANCE = {"wall_s": 0.25, "api_calls": 0.0, "bytes_out": 0.10, "peak_rss_mb": 0.25}
+WALL_FLOOR = 0.1   # seconds; smaller wall-time differences are noise, never a regression
+
+
+# ── Worker (runs inside the scratch copy) ─────────────────────────────────────
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10   # bytes on macOS, KiB on Linux
+
+
+def worker(root: Path, pipeline: str, cycles: int):
+    sys.path.insert(0, str(root))
+    from moltbook import api_calls, ratelimit
+    # The benchmark measures the pipelines, not the shared API budget
+    ratelimit.BUCKETS.update(read=(1e9, 1e9), write=(1e9, 1e9))
+
+    rel, fn_name = PIPELINES[pipeline]
+    sys.path.insert(0, str((root / rel).parent))   # script-local imports (campaign/state_store.py)
+    spec = importlib.util.spec_from_file_location(f"bench_{pipeline}", root / rel)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    if hasattr(mod, "publisher"):
+        mod.publisher.flush = lambda force=False: None
+    fn = getattr(mod, fn_name)
+
+    runs = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(cycles):
+            before, started = api_calls(), time.perf_counter()
+            fn()
+            runs.append({"wall_s": round(time.perf_counter() - started, 4),
+                         "api_calls": api_calls() - before})
+    print(json.dumps({"cycles": runs, "peak_rss_mb": round(_peak_rss_mb(), 1)}))
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def run_one(pipeline: str, n_posts: int, comments: int, cycles: int, latency: float) -> dict:
+    sys.path.insert(0, str(REPO_DIR))
+    from moltbook.fake_server import FakeMoltbook, SyntheticStore
+
+    fake = FakeMoltbook(SyntheticStore(n_posts, comments, seed=n_posts), latency=latency)
+    base_url = fake.start()
+    scratch = Path(tempfile.mkdtemp(prefix="mabp-bench-"))
+    try:
+        root = scratch / "repo"
+        shutil.copytree(REPO_DIR, root, ignore=shutil.ignore_patterns(
+            ".git", "bench", "watermarks", "__pycache__", "*.log", "*.sqlite3*", "*.bloom"))
+        env = dict(os.environ,
+                   MOLTBOOK_BASE_URL=base_url,
+                   MOLTBOOK_API_KEY="bench",
+                   MOLTBOOK_CACHE_DIR=str(scratch / "cache"),
+                   MOLTBOOK_RATELIMIT_DIR=str(scratch / "ratelimit"),
+                   MOLTBOOK_WATERMARK_DIR=str(scratch / "watermarks"))
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", pipeline, "--root", str(root), "--cycles", str(cycles)],
+            env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{pipeline} @ {n_posts} posts failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result.update(requests=fake.stats["requests"], bytes_out=fake.stats["bytes_out"])
+        return result
+    finally:
+        fake.stop()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def summarize(result: dict) -> dict:
+    """Flatten a run into the metrics compared against the baseline."""
+    return {
+        "wall_s":      result["cycles"][0]["wall_s"],
+        "api_calls":   sum(c["api_calls"] for c in result["cycles"]),
+        "bytes_out":   result["bytes_out"],
+        "peak_rss_mb": result["peak_rss_mb"],
+    }
+
+
+def compare(results: dict, baseline: dict) -> tuple[list[str], list[str]]:
+    """(regressions, keys with no baseline entry)."""
+    regressions, missing = [], []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if not base:
+            missing.append(key)
+            continue
+        now, before = summarize(res), summarize(base)
+        for metric, tol in TOLERANCE.items():
+            if metric == "wall_s" and now[metric] - before[metric] < WALL_FLOOR:
+                continue
+            if before[metric] and now[metric] > before[metric] * (1 + tol):
+                regressions.append(f"{key}: {metric} {before[metric]} → {now[metric]}")
+    return regressions, missing
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="10,100,1000", help="comma-separated post counts")
+    ap.add_argument("--comments", type=int, default=20, help="mean comments per post")
+    ap.add_argument("--pipelines", default=",".join(PIPELINES))
+    ap.add_argument("--cycles", type=int, default=2)
+    ap.add_argument("--latency", type=float, default=0.01, help="stub latency per request (s)")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs per pipeline and size")
+    ap.add_argument("--save", action="store_true", help=f"write results to {BASELINE.name}")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    ap.add_argument("--root", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        worker(Path(args.root), args.worker, args.cycles)
+        return
+
+    results = {}
+    print(f"{'PIPELINE':<22} {'POSTS':>6} {'CYCLE1 s':>9} {'CYCLE2 s':>9} {'CALLS':>7} {'KB OUT':>9} {'RSS MB':>7}")
+    print("─" * 75)
+    for n_posts in (int(s) for s in args.sizes.split(",")):
+        for pipeline in args.pipelines.split(","):
+            r = min((run_one(pipeline, n_posts, args.comments, args.cycles, args.latency)
+                     for _ in range(args.repeat)), key=lambda r: r["cycles"][0]["wall_s"])
+            results[f"{pipeline}@{n_posts}x{args.comments}"] = r
+            walls = [c["wall_s"] for c in r["cycles"]] + [None]
+            later = f"{walls[1]:>9.3f}" if walls[1] is not None else f"{'—':>9}"
+            print(f"{pipeline:<22} {n_posts:>6} {walls[0]:>9.3f} {later} "
+                  f"{summarize(r)['api_calls']:>7} {r['bytes_out'] / 1024:>9.1f} {r['peak_rss_mb']:>7.1f}")
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump({"recorded_at": datetime.now(timezone.utc).isoformat(),
+                       "sizes": args.sizes, "comments": args.comments, "cycles": args.cycles,
+                       "repeat": args.repeat,
+                       "latency": args.latency, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {BASELINE}")
+    elif BASELINE.exists():
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        if baseline.get("latency") != args.latency:
+            print(f"\nBaseline was recorded at --latency {baseline.get('latency')}; "
+                  "wall times are not comparable")
+        regressions, missing = compare(results, baseline["results"])
+        if missing:
+            print(f"\nNot in baseline (recorded at --sizes {baseline.get('sizes')} "
+                  f"--comments {baseline.get('comments')}): {', '.join(missing)}")
+        print("\nRegressions vs baseline:" if regressions else "\nNo regressions vs baseline.")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            sys.exit(1)
+    else:
+        print(f"\nNo baseline at {BASELINE} — run with --save to record one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+MABP Answer Sheet Scoring Benchmark
+Scores the same synthetic Instrument 1 answer sheets two ways and checks the
+primary/secondary archetypes agree on every one:
+
+  loop      per sheet, per answered question: add the option's weights to a
+            {archetype: score} dict, then sort it
+  engine    dataset.scoring — int8 answer matrix, one-hot × weight tensor as
+            one matmul, one argsort for the labels
+
+The instrument's scoring key is researcher-supplied (see dataset/scoring.py),
+so the benchmark draws a synthetic one: every option loads one or two random
+archetypes with weight 1–2. Sheets answer each question with probability 0.9.
+
+Usage:
+  python3 bench/bench_scoring.py
+  python3 bench/bench_scoring.py --sheets 1000000 --repeat 3
+"""
+import argparse, sys, time
+from pathlib import Path
+
+import numpy as np
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from dataset.scoring import ARCHETYPES, OPTIONS, QUESTIONS, answer_matrix, labels, score, weight_tensor
+
+
+def synthetic_key(rng) -> dict:
+    return {
+        q: {letter: {str(a): int(rng.integers(1, 3))
+                     for a in rng.choice(ARCHETYPES, size=rng.integers(1, 3), replace=False)}
+            for letter in OPTIONS}
+        for q in range(1, QUESTIONS + 1)
+    }
+
+
+def synthetic_sheets(n: int, rng) -> list[str]:
+    answers = rng.integers(0, len(OPTIONS), (n, QUESTIONS))
+    answered = rng.random((n, QUESTIONS)) < 0.9
+    return [" ".join(f"Q{q + 1}:{OPTIONS[c].upper()}" for q, (c, ok) in enumerate(zip(row, mask)) if ok)
+            for row, mask in zip(answers, answered)]
+
+
+def loop(matrix, key):
+    out = []
+    for row in matrix.tolist():
+        totals = dict.fromkeys(ARCHETYPES, 0)
+        for q, c in enumerate(row):
+            if c >= 0:
+                for a, w in key[q + 1][OPTIONS[c]].items():
+                    totals[a] += w
+        ranked = sorted(ARCHETYPES, key=lambda a: -totals[a])[:2]   # stable: ties keep ARCHETYPES order
+        out.append(tuple(a if totals[a] > 0 else None for a in ranked))
+    return out
+
+
+def engine(matrix, weights):
+    primary, secondary = labels(score(matrix, weights))
+    return list(zip(primary, secondary))
+
+
+def timed(fn, args, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sheets", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3, help="best of N")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    key = synthetic_key(rng)
+    weights = weight_tensor(key)
+    started = time.perf_counter()
+    matrix, is_sheet = answer_matrix(synthetic_sheets(args.sheets, rng))
+    t_parse = time.perf_counter() - started
+
+    t_loop, r_loop = timed(loop, (matrix, key), args.repeat)
+    t_engine, r_engine = timed(engine, (matrix, weights), args.repeat)
+    mismatches = sum(a != b for a, b in zip(r_loop, r_engine))
+
+    print(f"{len(matrix)} sheets × {QUESTIONS} questions  (parsed in {t_parse:.2f} s, synthetic key)")
+    print(f"{'SCORER':<10} {'SECONDS':>9} {'K/s':>9}")
+    print("─" * 30)
+    print(f"{'loop':<10} {t_loop:>9.3f} {len(matrix) / t_loop / 1000:>9.1f}")
+    print(f"{'engine':<10} {t_engine:>9.3f} {len(matrix) / t_engine / 1000:>9.1f}   {t_loop / t_engine:.2f}x")
+    print(f"\n{'All results identical.' if not mismatches else f'{mismatches} MISMATCHES'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
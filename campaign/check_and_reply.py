@@ -2,8 +2,9 @@
 """
 MABP Comment Watcher (monitor-only)
 Polls all thefranceway posts for unreplied comments and logs/prints them.
-Tracks replied comments in replied.json (local state) so the Moltbook API's
-limitation of not returning nested comments doesn't cause false positives.
+Tracks replied comments in the campaign state store (state_store.py) so the
+Moltbook API's limitation of not returning nested comments doesn't cause false
+positives. IDs added to replied.json by hand are still picked up.
 
 Note: post_reply()/mark_replied() below are defined but not called from
 check_once() — this script currently only surfaces unreplied comments for a
@@ -15,93 +16,93 @@ Usage:
   python3 check_and_reply.py --once     # single check, print unreplied
   python3 check_and_reply.py            # daemon, polls every 10 min
 """
-import requests, json, os, time, sys, logging
+import time, sys, logging, hashlib
 from pathlib import Path
-from datetime import datetime, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moltbook import get_posts as _get_posts, post_comment
+from moltbook.fetch import fetch_comments
+from moltbook.sync import ThreadSync
+from state_store import store
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
-API_KEY   = os.environ["MOLTBOOK_API_KEY"]
-BASE_H    = {"Authorization": f"Bearer {API_KEY}"}
-POST_H    = {**BASE_H, "Content-Type": "application/json"}
-BASE_URL  = "https://www.moltbook.com/api/v1"
-STATE     = Path(__file__).parent / "replied.json"
 POLL_SECS = 600  # 10 minutes
 
-def load_replied() -> set:
-    if STATE.exists():
-        with open(STATE) as f:
-            return set(json.load(f).get("replied_to", []))
-    return set()
-
-def save_replied(replied: set):
-    with open(STATE) as f:
-        data = json.load(f)
-    data["replied_to"] = sorted(replied)
-    data["last_updated"] = datetime.now(timezone.utc).isoformat()
-    with open(STATE, "w") as f:
-        json.dump(data, f, indent=2)
+def load_replied():
+    """Replied comment ID prefixes — a set-like view over the state store."""
+    return store().ids("replied")
 
 def short(uid: str) -> str:
     return uid[:8]
 
+def dedup_key(author: str, content: str) -> str:
+    """Short hash of (author, first 60 chars) — how API retries of one comment are recognised."""
+    return hashlib.sha1(f"{author}\0{content[:60]}".encode()).hexdigest()[:16]
+
 def get_posts():
-    r = requests.get(f"{BASE_URL}/posts?author=thefranceway&limit=50",
-                     headers=BASE_H, timeout=10)
-    return r.json().get("posts", [])
+    return _get_posts("thefranceway")
 
-def get_comments(post_id: str) -> list:
-    rc = requests.get(f"{BASE_URL}/posts/{post_id}/comments",
-                      headers=BASE_H, timeout=10)
-    return rc.json() if isinstance(rc.json(), list) else rc.json().get("comments", [])
+def find_unreplied(posts, replied: set, sync: ThreadSync) -> list:
+    """Return list of dicts with post + comment info for all unreplied comments.
 
-def find_unreplied(posts, replied: set) -> list:
-    """Return list of dicts with post + comment info for all unreplied comments."""
+    Threads whose comment_count hasn't moved aren't refetched: their unreplied
+    comments are carried over from the watermark's "pending" list. Changed
+    threads are fetched and only their new tail is scanned. The watermark also
+    keeps the dedup key of every comment scanned, replied or not, so a retried
+    duplicate of an already-answered comment is not reported later."""
     unreplied = []
-    for post in posts:
-        if post.get("comment_count", 0) == 0:
-            continue
-        comments = get_comments(post["id"])
-        seen_keys = set()
-        for c in comments:
-            author = c["author"]["name"]
-            if author == "thefranceway":
-                continue
-            if c.get("parent_id"):          # skip nested (agent-to-agent)
-                continue
-            key = (author, c["content"][:60])
-            if key in seen_keys:            # deduplicate API retries
-                continue
-            seen_keys.add(key)
-            if short(c["id"]) in replied:   # already handled
-                continue
-            unreplied.append({
-                "post_id":    post["id"],
-                "post_title": post.get("title", "")[:55],
-                "comment_id": c["id"],
-                "author":     author,
-                "content":    c["content"],
-            })
-        time.sleep(0.25)
+    active  = [p for p in posts if p.get("comment_count", 0) > 0]
+    changed = [p["id"] for p in active if sync.changed(p["id"], p["comment_count"])]
+    by_post = fetch_comments(changed)
+    for post in active:
+        pid = post["id"]
+        # Carry over earlier unreplied comments, minus any handled since
+        pending = [u for u in sync.get(pid).get("pending", [])
+                   if short(u["comment_id"]) not in replied]
+        if pid in by_post:
+            comments = by_post[pid]
+            seen_keys = set(sync.get(pid).get("keys", []))
+            seen_keys |= {dedup_key(u["author"], u["content"]) for u in pending}
+            for c in sync.tail(pid, comments):
+                author = c["author"]["name"]
+                if author == "thefranceway":
+                    continue
+                if c.get("parent_id"):          # skip nested (agent-to-agent)
+                    continue
+                key = dedup_key(author, c["content"])
+                if key in seen_keys:            # deduplicate API retries
+                    continue
+                seen_keys.add(key)
+                if short(c["id"]) in replied:   # already handled
+                    continue
+                pending.append({
+                    "post_id":    pid,
+                    "post_title": post.get("title", "")[:55],
+                    "comment_id": c["id"],
+                    "author":     author,
+                    "content":    c["content"],
+                })
+            sync.mark(pid, comments, post["comment_count"], pending=pending, keys=sorted(seen_keys))
+        elif pid not in changed:
+            sync.mark(pid, [], post["comment_count"], pending=pending)
+        unreplied.extend(pending)
     return unreplied
 
 def post_reply(post_id: str, parent_id: str, content: str) -> bool:
-    resp = requests.post(f"{BASE_URL}/posts/{post_id}/comments",
-        headers=POST_H,
-        json={"content": content, "parent_id": parent_id},
-        timeout=15)
+    resp = post_comment(post_id, content, parent_id=parent_id)
     return resp.status_code == 201
 
 def mark_replied(comment_id: str):
-    replied = load_replied()
-    replied.add(short(comment_id))
-    save_replied(replied)
+    load_replied().update([short(comment_id)])
 
 def check_once():
     replied = load_replied()
     posts   = get_posts()
-    unreplied = find_unreplied(posts, replied)
+    sync    = ThreadSync("check_and_reply")
+    unreplied = find_unreplied(posts, replied, sync)
+    sync.save()
 
     if not unreplied:
         log.info("All comments replied to ✓")
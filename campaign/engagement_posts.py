@@ -17,16 +17,17 @@ Usage:
   python3 engagement_posts.py --post classify
   python3 engagement_posts.py --list       # show all posts + status
 """
-import requests, json, os, sys, logging
+import sys, logging
 from datetime import datetime, timezone
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moltbook import create_post
+from state_file import StateFile
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
-API_KEY  = os.environ["MOLTBOOK_API_KEY"]
-HEADERS  = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-BASE     = "https://www.moltbook.com/api/v1"
 STATE    = Path(__file__).parent / "engagement_state.json"
 
 # ── Post definitions ──────────────────────────────────────────────────────────
@@ -96,39 +97,32 @@ POSTS = {
 
 # ── State management ──────────────────────────────────────────────────────────
 
-def load_state() -> dict:
-    if STATE.exists():
-        with open(STATE) as f:
-            return json.load(f)
-    return {"posted": {}}
-
-
-def save_state(state: dict):
-    with open(STATE, "w") as f:
-        json.dump(state, f, indent=2)
+def load_state() -> StateFile:
+    return StateFile(STATE, default={"posted": {}})
 
 
 # ── Post ──────────────────────────────────────────────────────────────────────
 
 def post(key: str) -> str | None:
     state = load_state()
-    if key in state["posted"]:
-        log.warning(f"{key} already posted: {state['posted'][key]['post_id'][:8]} on {state['posted'][key]['posted_at'][:10]}")
+    entry = state.get("posted", key)
+    if entry:
+        log.warning(f"{key} already posted: {entry['post_id'][:8]} on {entry['posted_at'][:10]}")
         return None
 
     p = POSTS[key]
     payload = {**p, "submolt_name": "humantech"}
-    resp = requests.post(f"{BASE}/posts", headers=HEADERS, json=payload, timeout=15)
+    resp = create_post(payload)
 
     if resp.status_code == 201:
         pid = resp.json().get("post", {}).get("id", "")
         log.info(f"Posted '{p['title'][:55]}' → {pid[:8]}")
-        state["posted"][key] = {
+        state.set("posted", key, {
             "post_id": pid,
             "posted_at": datetime.now(timezone.utc).isoformat(),
             "title": p["title"],
-        }
-        save_state(state)
+        })
+        state.flush()
         return pid
     elif resp.status_code == 403 and "suspended" in resp.text:
         log.error("Account suspended — stopping")
@@ -138,12 +132,12 @@ def post(key: str) -> str | None:
 
 
 def list_posts():
-    state = load_state()
+    posted = load_state().get("posted", default={})
     print(f"{'KEY':<12} {'STATUS':<12} {'POST ID':<12} {'TITLE'}")
     print("─" * 80)
     for key, p in POSTS.items():
-        if key in state["posted"]:
-            entry = state["posted"][key]
+        if key in posted:
+            entry = posted[key]
             status = f"posted {entry['posted_at'][:10]}"
             pid = entry["post_id"][:8]
         else:
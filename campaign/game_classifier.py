@@ -2,24 +2,33 @@
 """
 MABP Game Post Auto-Classifier
 Monitors the scenario + shadow engagement posts for A/B/C/D responses.
-Classifies each answer, replies with the archetype reading, logs to dataset.
+Classifies each answer and queues the archetype reading as a reply in the
+state store's outbox; reply_sender.py posts it (bounded concurrency, shared
+write rate limit, retries), so a busy thread never stalls classification.
+Classifications live in the campaign state store (state_store.py); the
+published post IDs are read from engagement_state.json, parsed once per cycle.
 Runs every 10 minutes via launchd.
 
 Usage:
   python3 game_classifier.py --once
   python3 game_classifier.py          # daemon, polls every 10 min
 """
-import requests, json, os, time, sys, re, logging
+import time, sys, logging
 from pathlib import Path
 from datetime import datetime, timezone
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dataset.answers import parse_letter
+from dataset.stability import StabilityTracker
+from moltbook import get_comments
+from moltbook.sync import ThreadSync, comment_counts
+from state_file import StateFile
+from state_store import store
+import reply_sender
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
-API_KEY  = os.environ["MOLTBOOK_API_KEY"]
-BASE_H   = {"Authorization": f"Bearer {API_KEY}"}
-POST_H   = {**BASE_H, "Content-Type": "application/json"}
-BASE     = "https://www.moltbook.com/api/v1"
 STATE    = Path(__file__).parent / "engagement_state.json"
 POLL     = 600  # 10 minutes
 
@@ -122,77 +131,45 @@ SHADOW_MAP = {
 
 # ── State helpers ─────────────────────────────────────────────────────────────
 
-def load_state() -> dict:
-    if STATE.exists():
-        with open(STATE) as f:
-            return json.load(f)
-    return {"posted": {}, "classified": {}}
-
-
-def save_state(state: dict):
-    with open(STATE, "w") as f:
-        json.dump(state, f, indent=2)
+_state = StateFile(STATE, default={"posted": {}})
 
 
 def get_post_id(key: str) -> str | None:
-    state = load_state()
-    entry = state.get("posted", {}).get(key)
+    entry = _state.get("posted", key)
     return entry["post_id"] if entry else None
 
 
-# ── Parse answer ──────────────────────────────────────────────────────────────
-
-def parse_letter(text: str) -> str | None:
-    """Extract A/B/C/D answer from comment text. Returns lowercase letter or None."""
-    text = text.strip()
-    # Direct single-letter response
-    if re.match(r'^[abcdeABCDE][\.\s\-—:!]?$', text):
-        return text[0].lower()
-    # Starts with letter + space/punctuation
-    m = re.match(r'^([abcdeABCDE])[\s\.\-—:]', text)
-    if m:
-        return m.group(1).lower()
-    # "My answer is X" / "I choose X" / "Option X"
-    m = re.search(r'\b(?:answer is|choose|pick|going with|option|letter)\s+([abcdeABCDE])\b', text, re.I)
-    if m:
-        return m.group(1).lower()
-    # Bold/quote: **A** or "A"
-    m = re.search(r'[\*\"`]([abcdeABCDE])[\*\"`]', text)
-    if m:
-        return m.group(1).lower()
-    return None
-
-
 # ── Core check ────────────────────────────────────────────────────────────────
 
-def check_post(key: str, classification_map: dict) -> int:
+def check_post(key: str, classification_map: dict, sync: ThreadSync, counts: dict,
+               observed: list | None = None) -> int:
     post_id = get_post_id(key)
     if not post_id:
         log.warning(f"{key} post not yet published — skipping")
         return 0
 
-    r = requests.get(f"{BASE}/posts/{post_id}/comments", headers=BASE_H, timeout=10)
-    data = r.json()
-    comments = data if isinstance(data, list) else data.get("comments", [])
+    count = counts.get(post_id)
+    if not sync.changed(post_id, count):
+        return 0
+    comments = get_comments(post_id)
 
-    state = load_state()
-    classified = state.setdefault("classified", {}).setdefault(key, {})
+    db = store()
     new_count = 0
 
-    for c in comments:
+    for c in sync.tail(post_id, comments):
         cid = c["id"]
         author = c.get("author", {}).get("name", "?")
         if author == "thefranceway":
             continue
         if c.get("parent_id"):   # skip nested replies
             continue
-        if cid in classified:    # already handled
+        if db.is_classified(key, cid):    # already handled
             continue
 
         letter = parse_letter(c.get("content", ""))
         if not letter or letter not in classification_map:
             # Can't parse — mark as seen but don't reply
-            classified[cid] = {"author": author, "answer": None, "replied": False}
+            db.record_classified(key, cid, {"author": author, "answer": None, "replied": False})
             continue
 
         mapping = classification_map[letter]
@@ -207,53 +184,61 @@ def check_post(key: str, classification_map: dict) -> int:
             "just say so and I will send the instrument."
         )
 
-        resp = requests.post(
-            f"{BASE}/posts/{post_id}/comments",
-            headers=POST_H,
-            json={"content": reply, "parent_id": cid},
-            timeout=15,
-        )
-
-        success = resp.status_code == 201
-        classified[cid] = {
+        # Queue before recording: a crash in between re-queues nothing (the
+        # outbox is keyed by parent_id) but never leaves an answer unreplied
+        queued = db.enqueue_reply(cid, post_id, reply, game=key)
+        db.record_classified(key, cid, {
             "author": author,
             "answer": letter,
             archetype_key: label,
-            "replied": success,
+            # A reply queued before a crash may already be out; reply_sent() could not
+            # flag a row that did not exist yet. Otherwise reply_sender.py flips it.
+            "replied": db.reply_status(cid) == "sent",
             "classified_at": datetime.now(timezone.utc).isoformat(),
-        }
-
-        if success:
-            rid = resp.json().get("comment", {}).get("id", "")[:8]
-            log.info(f"  {key}: @{author} → {label} [{letter}] | reply {rid}")
+        })
+        if queued:
+            log.info(f"  {key}: @{author} → {label} [{letter}] | reply queued")
             new_count += 1
-        else:
-            log.warning(f"  {key}: @{author} reply failed {resp.status_code}")
+        if observed is not None and archetype_key == "archetype":
+            observed.append(label)
 
-        time.sleep(2)  # small pause between replies
-
-    state["classified"][key] = classified
-    save_state(state)
+    sync.mark(post_id, comments, count)
     return new_count
 
 
 def check_once():
     log.info("Checking game posts for responses...")
+    _state.refresh()
+    sync = ThreadSync("game_classifier")
+    counts = comment_counts()
+    stability = StabilityTracker()
+    if not stability.path.exists():   # first run: start from every classification so far
+        history = sorted(store().classified("scenario").values(), key=lambda e: e.get("classified_at") or "")
+        stability.seed(e.get("archetype") for e in history)
+    observed = []
     n = 0
-    n += check_post("scenario", SCENARIO_MAP)
-    time.sleep(0.5)
-    n += check_post("shadow", SHADOW_MAP)
+    n += check_post("scenario", SCENARIO_MAP, sync, counts, observed)
+    n += check_post("shadow", SHADOW_MAP, sync, counts)
+    sync.save()
+    stability.observe(observed)
     if n:
-        log.info(f"Classified and replied to {n} new response(s)")
+        log.info(f"Classified {n} new response(s), replies queued")
     else:
         log.info("No new classifiable responses")
 
 
+def run_once():
+    """Classify, then send whatever the outbox has due (standalone runs; the
+    mabp service schedules reply_sender as its own job)."""
+    check_once()
+    reply_sender.drain_once()
+
+
 def run_daemon():
     log.info(f"Game classifier started — polling every {POLL // 60} min")
     while True:
         try:
-            check_once()
+            run_once()
         except Exception as e:
             log.error(f"Error: {e}")
         time.sleep(POLL)
@@ -261,6 +246,6 @@ def run_daemon():
 
 if __name__ == "__main__":
     if "--once" in sys.argv:
-        check_once()
+        run_once()
     else:
         run_daemon()
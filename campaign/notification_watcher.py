@@ -2,25 +2,27 @@
 """
 MABP Notification Watcher
 Polls the Moltbook /notifications endpoint for new engagement.
-Tracks seen notification IDs locally (no mark-as-read API exists).
+Tracks seen notification IDs locally in the campaign state store (no
+mark-as-read API exists).
 Logs new activity to notifications.log and stdout.
 
 Usage:
   python3 notification_watcher.py --once    # single check
   python3 notification_watcher.py           # daemon, polls every 10 min
 """
-import requests, json, os, time, sys, logging
+import json, time, sys, logging
 from pathlib import Path
-from datetime import datetime, timezone
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moltbook import get_comments, get_notifications, get_post
+from moltbook.fetch import fetch_all
+from moltbook.sync import ThreadSync
+from state_store import store
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
-API_KEY   = os.environ["MOLTBOOK_API_KEY"]
-BASE_H    = {"Authorization": f"Bearer {API_KEY}"}
-BASE_URL  = "https://www.moltbook.com/api/v1"
-SEEN_FILE = Path(__file__).parent / "seen_notifications.json"
 LOG_FILE  = Path(__file__).parent / "notifications.log"
 POLL_SECS = 600  # 10 minutes
 
@@ -32,35 +34,25 @@ PINNED_POSTS = {
 }
 
 
-def load_seen() -> set:
-    if SEEN_FILE.exists():
-        with open(SEEN_FILE) as f:
-            return set(json.load(f).get("seen", []))
-    return set()
-
-
-def save_seen(seen: set):
-    data = {"seen": sorted(seen), "last_updated": datetime.now(timezone.utc).isoformat()}
-    with open(SEEN_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+def load_seen():
+    """Seen notification IDs — a set-like view over the state store."""
+    return store().ids("notification")
 
 
-def get_notifications() -> list:
-    r = requests.get(f"{BASE_URL}/notifications", headers=BASE_H, timeout=10)
-    return r.json().get("notifications", [])
+def save_seen(new_ids: list):
+    store().ids("notification").update(new_ids)
 
 
 def fetch_post_comments(post_id: str) -> list:
-    r = requests.get(f"{BASE_URL}/posts/{post_id}/comments", headers=BASE_H, timeout=10)
-    data = r.json()
-    return data if isinstance(data, list) else data.get("comments", [])
+    return get_comments(post_id)
 
 
 def fetch_post_title(post_id: str) -> str:
-    r = requests.get(f"{BASE_URL}/posts/{post_id}", headers=BASE_H, timeout=10)
-    data = r.json()
-    post = data.get("post", data)
-    return post.get("title", "unknown")[:70]
+    return get_post(post_id).get("title", "unknown")[:70]
+
+
+def fetch_thread(post_id: str) -> tuple[str, list]:
+    return fetch_post_title(post_id), fetch_post_comments(post_id)
 
 
 def find_comment_in_list(comments: list, comment_id: str) -> dict | None:
@@ -92,17 +84,17 @@ def check_once():
             no_post.append(n)
 
     results = []
+    fresh_ids = []
 
-    # Fetch comments per post (once per post)
+    # Fetch title + comments per post (once per post, all posts concurrently)
+    threads = fetch_all(fetch_thread, by_post)
     for post_id, notifs in by_post.items():
-        try:
-            title = fetch_post_title(post_id)
-            time.sleep(0.3)
-            comments = fetch_post_comments(post_id)
-            comment_map = {c["id"]: c for c in comments}
-        except Exception as e:
-            log.error(f"  Failed to fetch post {post_id[:8]}: {e}")
-            title, comment_map = "?", {}
+        if post_id not in threads:
+            # Fetch failed (logged by fetch_all) — leave these unseen so the next cycle retries them
+            log.warning(f"  {len(notifs)} notification(s) on {post_id[:8]} deferred — thread fetch failed")
+            continue
+        title, comments = threads[post_id]
+        comment_map = {c["id"]: c for c in comments}
 
         for n in notifs:
             cid = n.get("relatedCommentId", "")
@@ -123,7 +115,7 @@ def check_once():
                 "timestamp":   n["createdAt"],
             }
             results.append(entry)
-            seen.add(n["id"])
+            fresh_ids.append(n["id"])
 
             # Log to stdout
             symbol = {"comment_reply": "↩", "post_comment": "💬", "mention": "📣", "new_follower": "➕"}.get(n["type"], "•")
@@ -131,16 +123,14 @@ def check_once():
             if content and content != "(nested reply — not returned by API)":
                 log.info(f"    {content[:120]}")
 
-        time.sleep(0.4)
-
     # Handle notifications without a post (e.g. new_follower)
     for n in no_post:
         entry = {"notif_id": n["id"], "type": n["type"], "timestamp": n["createdAt"]}
         results.append(entry)
-        seen.add(n["id"])
+        fresh_ids.append(n["id"])
         log.info(f"  ➕ [{n['type']}] (no post linked)")
 
-    save_seen(seen)
+    save_seen(fresh_ids)
 
     # Append to log file
     with open(LOG_FILE, "a") as f:
@@ -152,32 +142,29 @@ def check_once():
 
 def check_pinned_posts():
     """Check pinned posts for new top-level comments we haven't seen."""
-    seen_file = Path(__file__).parent / "seen_pinned_comments.json"
-    seen = set(json.load(open(seen_file)).get("seen", [])) if seen_file.exists() else set()
-    new_seen = set(seen)
-
-    for post_id, note in PINNED_POSTS.items():
-        try:
-            comments = fetch_post_comments(post_id)
-            title = fetch_post_title(post_id)
-            for c in comments:
-                cid = c["id"]
-                if cid in seen:
-                    continue
-                author = c.get("author", {}).get("name", "?")
-                if author == "thefranceway" or c.get("parent_id"):
-                    new_seen.add(cid)
-                    continue
-                content = c.get("content", "")[:200]
-                log.info(f"  [PINNED] @{author} on \"{title[:50]}\"")
-                log.info(f"    {content}")
-                new_seen.add(cid)
-            time.sleep(0.5)
-        except Exception as e:
-            log.error(f"  Pinned post {post_id[:8]} failed: {e}")
-
-    with open(seen_file, "w") as f:
-        json.dump({"seen": sorted(new_seen), "last_updated": datetime.now(timezone.utc).isoformat()}, f, indent=2)
+    seen = store().ids("pinned_comment")
+    new_seen = []
+
+    # Pinned posts aren't ours, so there's no listing comment_count to skip on —
+    # fetch each one, but only walk the tail past its watermark.
+    sync = ThreadSync("pinned_posts")
+    threads = fetch_all(fetch_thread, PINNED_POSTS)
+    for post_id, (title, comments) in threads.items():
+        for c in sync.tail(post_id, comments):
+            cid = c["id"]
+            if cid in seen:
+                continue
+            author = c.get("author", {}).get("name", "?")
+            if author == "thefranceway" or c.get("parent_id"):
+                new_seen.append(cid)
+                continue
+            content = c.get("content", "")[:200]
+            log.info(f"  [PINNED] @{author} on \"{title[:50]}\"")
+            log.info(f"    {content}")
+            new_seen.append(cid)
+        sync.mark(post_id, comments, None)
+    sync.save()
+    seen.update(new_seen)
 
 
 def run_daemon():
@@ -2,22 +2,24 @@
 """
 MABP 14-Day Autonomous Campaign Poster
 Posts the next scheduled thesis to Moltbook, then waits 24h.
-Tracks which days have been posted in campaign/state.json.
+Tracks which days have been posted in the campaign state store
+(state_store.py; days added to campaign/state.json by hand still count).
 
 Run once to post today's thesis:  python3 poster.py --once
 Run as daemon (24h loop):         python3 poster.py
 """
-import requests, json, os, time, sys, logging
+import time, sys, logging
 from datetime import datetime, timezone
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moltbook import create_post
+from state_store import store
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
-API_KEY  = os.environ["MOLTBOOK_API_KEY"]
-HEADERS  = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-BASE     = "https://www.moltbook.com/api/v1"
-STATE    = Path(__file__).parent / "state.json"
+POLL_SECS = 86400  # 24 hours
 
 POSTS = [
     # Day 1
@@ -187,14 +189,8 @@ POSTS = [
 ]
 
 def load_state():
-    if STATE.exists():
-        with open(STATE) as f:
-            return json.load(f)
-    return {"posted_days": [], "last_post": None}
-
-def save_state(state):
-    with open(STATE, "w") as f:
-        json.dump(state, f, indent=2)
+    db = store()
+    return {"posted_days": sorted(db.posted_days()), "last_post": db.last_post()}
 
 def post_day(day_index):
     post_data = POSTS[day_index]
@@ -203,7 +199,7 @@ def post_day(day_index):
         return True
 
     post_data["submolt_name"] = "humantech"
-    resp = requests.post(f"{BASE}/posts", headers=HEADERS, json=post_data, timeout=15)
+    resp = create_post(post_data)
 
     if resp.status_code == 201:
         data = resp.json()
@@ -218,47 +214,45 @@ def post_day(day_index):
         log.error(f"Error {resp.status_code}: {resp.text[:200]}")
         return False
 
-def run():
-    once = "--once" in sys.argv
-    state = load_state()
+def next_unposted_day(state):
     posted_days = set(state["posted_days"])
+    return next((i for i in range(len(POSTS)) if i not in posted_days), None)
 
-    # Find next unposted day
-    next_day = None
-    for i in range(len(POSTS)):
-        if i not in posted_days:
-            next_day = i
-            break
-
+def post_next():
+    """Post the next unposted day. Returns False once the campaign is complete."""
+    state = load_state()
+    next_day = next_unposted_day(state)
     if next_day is None:
-        log.info("All 14 days posted. Campaign complete.")
-        return
-
-    while True:
-        state = load_state()
-        posted_days = set(state["posted_days"])
+        log.info("Campaign complete — all days posted.")
+        return False
 
-        next_day = None
-        for i in range(len(POSTS)):
-            if i not in posted_days:
-                next_day = i
-                break
+    success = post_day(next_day)
+    if success:
+        store().mark_posted_day(next_day)
+    return True
 
-        if next_day is None:
-            log.info("Campaign complete — all days posted.")
-            break
+def post_if_due():
+    """post_next(), but only once POLL_SECS have passed since the last post —
+    lets the mabp service restart without double-posting a day."""
+    last = load_state().get("last_post")
+    if last:
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(last)).total_seconds()
+        if age < POLL_SECS:
+            return True
+    return post_next()
 
-        success = post_day(next_day)
-        if success:
-            state["posted_days"].append(next_day)
-            state["last_post"] = datetime.now(timezone.utc).isoformat()
-            save_state(state)
+def run():
+    once = "--once" in sys.argv
+    if next_unposted_day(load_state()) is None:
+        log.info("All 14 days posted. Campaign complete.")
+        return
 
+    while post_next():
         if once:
             break
 
         log.info("Waiting 24 hours until next post...")
-        time.sleep(86400)
+        time.sleep(POLL_SECS)
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+MABP Reply Sender
+Drains the reply outbox (the `replies` table of the campaign state store)
+that game_classifier.py fills. Classification only queues the reading; this
+posts it, so a viral thread never holds up the classifier.
+
+  concurrency   at most CONCURRENCY replies in flight (asyncio tasks, each
+                running the blocking client call in a worker thread)
+  rate limit    every post draws from the shared "write" bucket
+                (moltbook/ratelimit.py), so all daemons together stay in budget
+  retries       network errors, 429, 403 and 5xx back off exponentially
+                (Retry-After wins when the API sends one); other 4xx are
+                permanent and the reply is marked 'failed'
+  idempotency   one outbox row per parent_id, sent with that id as its
+                Idempotency-Key. A send is claimed under a lease first; if
+                the lease expires (the process died mid-request) the thread
+                is checked for our reply before posting again.
+
+Usage:
+  python3 reply_sender.py --once      # drain what is due, then exit
+  python3 reply_sender.py --status    # outbox counts
+  python3 reply_sender.py             # daemon, drains every 30 s
+"""
+import asyncio, time, sys, logging
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moltbook import get_comments, post_comment
+from state_store import store
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
+log = logging.getLogger(__name__)
+
+AUTHOR      = "thefranceway"
+POLL_SECS   = 30
+CONCURRENCY = 4
+LEASE       = 120           # seconds a claimed reply is ours before another sender may retry it
+BACKOFF     = (30, 3600)    # first retry after 30 s, doubling, capped at 1 h
+RETRYABLE   = {403, 408, 425, 429}   # 403: temporary suspension
+
+
+def backoff(attempts: int, retry_after: str | None = None) -> float:
+    delay = min(BACKOFF[0] * 2 ** max(attempts - 1, 0), BACKOFF[1])
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return time.time() + delay
+
+
+def already_replied(post_id: str, parent_id: str) -> str | None:
+    """Our reply's id if the thread already has it (best effort: the API may omit nested replies)."""
+    for c in get_comments(post_id):
+        if c.get("parent_id") == parent_id and c.get("author", {}).get("name") == AUTHOR:
+            return c.get("id") or ""
+    return None
+
+
+def send(row) -> str:
+    """Post one claimed reply. Returns its new outbox status."""
+    db = store()
+    parent_id = row["parent_id"]
+    try:
+        if row["status"] == "sending":   # lease expired mid-request: it may have gone through
+            existing = already_replied(row["post_id"], parent_id)
+            if existing is not None:
+                db.reply_sent(parent_id, existing or None)
+                return "sent"
+        resp = post_comment(row["post_id"], row["content"], parent_id=parent_id, idempotency_key=parent_id)
+    except requests.RequestException as e:
+        db.reply_failed(parent_id, str(e), backoff(row["attempts"] + 1))
+        return "pending"
+
+    if resp.status_code in (200, 201):
+        try:
+            reply_id = (resp.json().get("comment") or {}).get("id")
+        except ValueError:
+            reply_id = None
+        db.reply_sent(parent_id, reply_id)
+        return "sent"
+    error = f"{resp.status_code}: {resp.text[:200]}"
+    if resp.status_code in RETRYABLE or resp.status_code >= 500:
+        db.reply_failed(parent_id, error, backoff(row["attempts"] + 1, resp.headers.get("Retry-After")))
+        return "pending"
+    log.error(f"Reply to {parent_id[:8]} rejected — {error}")
+    db.reply_failed(parent_id, error, None)
+    return "failed"
+
+
+async def drain(concurrency: int = CONCURRENCY) -> dict[str, int]:
+    """Send every reply that is due, at most `concurrency` at a time."""
+    db = store()
+    now = time.time()
+    rows = db.due_replies(now)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(row):
+        async with sem:
+            if not db.claim_reply(row["parent_id"], time.time(), LEASE):
+                return None
+            return await asyncio.to_thread(send, row)
+
+    outcome: dict[str, int] = {}
+    for status in await asyncio.gather(*(one(r) for r in rows)):
+        if status:
+            outcome[status] = outcome.get(status, 0) + 1
+    return outcome
+
+
+def drain_once() -> dict[str, int]:
+    outcome = asyncio.run(drain())
+    if outcome:
+        log.info("Replies: " + ", ".join(f"{n} {s}" for s, n in sorted(outcome.items())))
+    return outcome
+
+
+def run_daemon():
+    log.info(f"Reply sender started — draining every {POLL_SECS} s")
+    while True:
+        try:
+            drain_once()
+        except Exception as e:
+            log.error(f"Error: {e}")
+        time.sleep(POLL_SECS)
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        counts = store().reply_counts()
+        print("  ".join(f"{s}={n}" for s, n in sorted(counts.items())) or "outbox empty")
+    elif "--once" in sys.argv:
+        drain_once()
+    else:
+        run_daemon()
@@ -0,0 +1,93 @@
+"""
+MABP Shared JSON State File
+engagement_state.json is written by engagement_posts.py (new game posts) and
+read by the classifier daemon. StateFile keeps one parsed copy per process:
+
+  - refresh() re-parses only when the file's mtime has moved, so callers can
+    read it as often as they like and pay one stat per cycle;
+  - set() changes a value in memory and records its (section, key) as dirty;
+  - flush() takes an exclusive flock on a sidecar .lock file, re-reads the
+    file, applies just the dirty keys on top, and writes it back atomically
+    (temp file + rename) — so two processes updating different keys never
+    clobber each other, and a reader never sees a half-written file.
+
+Usage:
+    state = StateFile(STATE, default={"posted": {}})
+    pid = state.get("posted", "scenario", {}).get("post_id")
+    state.set("posted", "shadow", entry)
+    state.flush()
+"""
+from __future__ import annotations
+
+import copy
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+_MISSING = object()
+
+
+class StateFile:
+    def __init__(self, path: Path, default: dict | None = None):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.default = default or {}
+        self.data: dict = copy.deepcopy(self.default)
+        self._mtime: int | None = None
+        self._dirty: dict[tuple[str, str], object] = {}
+        self.refresh()
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return copy.deepcopy(self.default)
+        with open(self.path) as f:
+            return {**copy.deepcopy(self.default), **json.load(f)}
+
+    def refresh(self):
+        """Re-parse the file if it changed on disk; pending sets are kept."""
+        mtime = self.path.stat().st_mtime_ns if self.path.exists() else None
+        if mtime == self._mtime:
+            return
+        self.data, self._mtime = self._read(), mtime
+        self._apply(self.data)
+
+    def get(self, section: str, key: str | None = None, default=None):
+        value = self.data.get(section, _MISSING)
+        if key is not None and value is not _MISSING:
+            value = value.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, section: str, key: str, value):
+        self.data.setdefault(section, {})[key] = value
+        self._dirty[(section, key)] = value
+
+    def _apply(self, data: dict):
+        for (section, key), value in self._dirty.items():
+            data.setdefault(section, {})[key] = value
+
+    @contextmanager
+    def locked(self):
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def flush(self):
+        """Write the dirty keys back, merged over whatever is on disk now."""
+        if not self._dirty:
+            return
+        with self.locked():
+            data = self._read()
+            self._apply(data)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.data, self._mtime = data, self.path.stat().st_mtime_ns
+            self._dirty.clear()
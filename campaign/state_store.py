@@ -0,0 +1,475 @@
+"""
+MABP Campaign State Store
+One embedded SQLite database (WAL mode) for the state the campaign daemons
+used to keep in whole-file JSON rewrites:
+
+  ids          seen notifications, seen pinned-post comments, replied comments
+  classified   game answers classified by game_classifier.py
+  replies      outbox of readings waiting to be posted (reply_sender.py)
+  posted_days  14-day campaign progress (poster.py)
+
+Every table is keyed by a primary-key index, membership checks are single
+lookups, and saves are transactional upserts of just the new rows — cost
+tracks new items, not history.
+
+Seen notification / pinned-comment IDs are UUIDs and are stored packed as
+16-byte BLOBs (not 36-char text), the database is read through SQLite's
+mmap, and each of those kinds has a memory-mapped Bloom filter in front
+(state.<kind>.bloom next to the database) so the common "not seen yet"
+answer never touches the index. Nothing is loaded into Python memory, so
+opening the store stays instant and flat at millions of IDs. The filters
+are derived data: a stale or missing one is rebuilt from the table.
+
+The old JSON files (seen_notifications.json, seen_pinned_comments.json,
+replied.json, state.json, the "classified" block of engagement_state.json)
+are imported additively whenever their mtime changes. The daemons no longer
+write them, so a change means a hand edit (e.g. adding IDs to replied.json
+after replying manually), and that keeps working.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE    = Path(__file__).parent
+DB_PATH = HERE / "state.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    kind     TEXT NOT NULL,          -- 'notification' | 'pinned_comment' | 'replied'
+    id       BLOB NOT NULL,          -- 16-byte UUID for PACKED_KINDS, 8-char prefix text for 'replied'
+    added_at TEXT,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS classified (
+    game          TEXT NOT NULL,     -- 'scenario' | 'shadow'
+    comment_id    TEXT NOT NULL,
+    author        TEXT,
+    answer        TEXT,
+    label_key     TEXT,              -- 'archetype' | 'pattern'
+    label         TEXT,
+    replied       INTEGER NOT NULL DEFAULT 0,
+    classified_at TEXT,
+    PRIMARY KEY (game, comment_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS replies (
+    parent_id    TEXT PRIMARY KEY,   -- idempotency key: one reply per answered comment
+    post_id      TEXT NOT NULL,
+    game         TEXT,
+    content      TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'pending',   -- 'pending' | 'sending' | 'sent' | 'failed'
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,           -- epoch seconds; a lease while 'sending'
+    last_error   TEXT,
+    queued_at    TEXT,
+    sent_at      TEXT,
+    reply_id     TEXT
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS replies_due ON replies (status, next_attempt);
+
+CREATE TABLE IF NOT EXISTS posted_days (
+    day       INTEGER PRIMARY KEY,
+    posted_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Kinds whose IDs are full UUIDs, stored packed and fronted by a Bloom filter
+PACKED_KINDS = ("notification", "pinned_comment")
+
+BLOOM_BITS_PER_ID = 10         # ~1% false positives at 7 hashes
+BLOOM_HASHES      = 7
+BLOOM_MIN_IDS     = 1 << 16
+
+# (json file, importer method) — see StateStore._import_legacy
+LEGACY_FILES = {
+    "seen_notifications.json":   "_import_seen_notifications",
+    "seen_pinned_comments.json": "_import_seen_pinned",
+    "replied.json":              "_import_replied",
+    "engagement_state.json":     "_import_classified",
+    "state.json":                "_import_posted_days",
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def pack_id(item: str) -> bytes:
+    """16 bytes for a UUID; anything else falls back to its UTF-8 bytes."""
+    try:
+        return uuid.UUID(item).bytes
+    except ValueError:
+        return item.encode()
+
+
+class BloomFilter:
+    """Bloom filter over packed IDs in a memory-mapped file.
+
+    The header records which ids_version of the table the bits reflect, so a
+    reader can tell when another process (or a crash) left it behind. Bits
+    only ever go 0 → 1, so lookups need no lock; writers take a flock.
+    """
+    HEADER = struct.Struct("<8sQQQI")   # magic, version, count, bits, hashes
+    MAGIC  = b"MABPBLM1"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._f.fileno(), 0)
+        magic, _, _, self.bits, self.hashes = self.HEADER.unpack_from(self._mm)
+        if magic != self.MAGIC or len(self._mm) < self.HEADER.size + self.bits // 8:
+            self.close()
+            raise ValueError(f"not a bloom filter: {self.path}")
+
+    @classmethod
+    def create(cls, path: Path, capacity: int) -> "BloomFilter":
+        bits = -(-max(capacity, BLOOM_MIN_IDS) * BLOOM_BITS_PER_ID // 8) * 8
+        tmp = Path(path).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, 0, 0, bits, BLOOM_HASHES))
+            f.truncate(cls.HEADER.size + bits // 8)
+        os.replace(tmp, path)
+        return cls(path)
+
+    @property
+    def version(self) -> int:
+        return self.HEADER.unpack_from(self._mm)[1]
+
+    @property
+    def count(self) -> int:
+        return self.HEADER.unpack_from(self._mm)[2]
+
+    @property
+    def capacity(self) -> int:
+        return self.bits // BLOOM_BITS_PER_ID
+
+    def _positions(self, key: bytes):
+        h = hashlib.blake2b(key, digest_size=16).digest()
+        a, b = int.from_bytes(h[:8], "little"), int.from_bytes(h[8:], "little") | 1
+        return [(a + i * b) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        mm, off = self._mm, self.HEADER.size
+        return all(mm[off + (p >> 3)] >> (p & 7) & 1 for p in self._positions(key))
+
+    def add(self, keys, version: int | None = None):
+        """Set the bits for `keys`; stamp `version` if given."""
+        mm, off = self._mm, self.HEADER.size
+        fcntl.flock(self._f, fcntl.LOCK_EX)
+        try:
+            n = 0
+            for key in keys:
+                for p in self._positions(key):
+                    mm[off + (p >> 3)] |= 1 << (p & 7)
+                n += 1
+            _, old_version, count, bits, hashes = self.HEADER.unpack_from(mm)
+            self.HEADER.pack_into(mm, 0, self.MAGIC, old_version if version is None else version,
+                                  count + n, bits, hashes)
+        finally:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+
+    def close(self):
+        self._mm.close()
+        self._f.close()
+
+
+class IdSet:
+    """Set-like view over one kind of ID: `x in ids`, `len(ids)`, `ids.update(new)`."""
+
+    def __init__(self, store: "StateStore", kind: str):
+        self.store, self.kind = store, kind
+        self.packed = kind in PACKED_KINDS
+        self.bloom = store._bloom(kind) if self.packed else None
+
+    def _key(self, item: str):
+        return pack_id(item) if self.packed else item
+
+    def __contains__(self, item: str) -> bool:
+        key = self._key(item)
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        row = self.store.conn.execute(
+            "SELECT 1 FROM ids WHERE kind = ? AND id = ?", (self.kind, key)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.store.conn.execute(
+            "SELECT COUNT(*) FROM ids WHERE kind = ?", (self.kind,)).fetchone()[0]
+
+    def update(self, items):
+        keys = [self._key(i) for i in items]
+        if not keys:
+            return
+        now = _now()
+        with self.store.conn:
+            self.store.conn.executemany(
+                "INSERT OR IGNORE INTO ids (kind, id, added_at) VALUES (?, ?, ?)",
+                [(self.kind, k, now) for k in keys])
+            version = self.store._bump_ids_version(self.kind) if self.packed else None
+            if self.bloom is not None:
+                # Bits go in before the rows commit: a reader in between may get a
+                # false positive (settled by the SQL lookup), never a false "not seen".
+                # Only claim the new version if the filter was current before this
+                # write; otherwise leave it stale and the next ids() call rebuilds it.
+                in_sync = self.bloom.version == version - 1
+                self.bloom.add(keys)
+        if self.bloom is not None:
+            if in_sync:
+                self.bloom.add([], version)
+            if self.bloom.count > self.bloom.capacity:
+                self.bloom = self.store._bloom(self.kind, rebuild=True)
+
+
+class StateStore:
+    def __init__(self, path: Path = DB_PATH, legacy_dir: Path = HERE, bloom: bool = True):
+        self.path = Path(path)
+        self.legacy_dir = Path(legacy_dir)
+        self.use_bloom = bloom
+        self._local = threading.local()   # one connection per thread (mabp_service runs jobs in threads)
+        self._blooms: dict[str, BloomFilter] = {}
+        self._bloom_lock = threading.Lock()
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._import_legacy()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=268435456")   # read pages straight from the OS page cache
+            self._local.conn = conn
+        return conn
+
+    # ── Seen / replied IDs ───────────────────────────────────────────────────
+
+    def ids(self, kind: str) -> IdSet:
+        return IdSet(self, kind)
+
+    def _ids_version(self, kind: str) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (f"ids_version:{kind}",)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump_ids_version(self, kind: str) -> int:
+        """Increment a kind's write counter; call inside the write's transaction."""
+        version = self._ids_version(kind) + 1
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                          (f"ids_version:{kind}", str(version)))
+        return version
+
+    def _bloom(self, kind: str, rebuild: bool = False) -> BloomFilter | None:
+        """The kind's Bloom filter, rebuilt from the table if missing or stale."""
+        if not self.use_bloom:
+            return None
+        path = self.path.with_name(f"{self.path.stem}.{kind}.bloom")
+        with self._bloom_lock:
+            bloom = self._blooms.get(kind)
+            if bloom is None and path.exists() and not rebuild:
+                try:
+                    bloom = BloomFilter(path)
+                except (ValueError, struct.error):
+                    bloom = None
+            version = self._ids_version(kind)
+            if bloom is None or rebuild or bloom.version != version or bloom.count > bloom.capacity:
+                if bloom is not None:
+                    bloom.close()
+                n = self.conn.execute("SELECT COUNT(*) FROM ids WHERE kind = ?", (kind,)).fetchone()[0]
+                bloom = BloomFilter.create(path, capacity=2 * n)
+                rows = self.conn.execute("SELECT id FROM ids WHERE kind = ?", (kind,))
+                bloom.add((r[0] for r in rows), version)
+            self._blooms[kind] = bloom
+        return bloom
+
+    def _migrate(self):
+        """user_version 1: repack text UUIDs written before PACKED_KINDS existed."""
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        with self.conn:
+            for kind in PACKED_KINDS:
+                rows = self.conn.execute(
+                    "SELECT id, added_at FROM ids WHERE kind = ? AND typeof(id) = 'text'", (kind,)).fetchall()
+                self.conn.executemany("DELETE FROM ids WHERE kind = ? AND id = ?", [(kind, r[0]) for r in rows])
+                self.conn.executemany("INSERT OR IGNORE INTO ids (kind, id, added_at) VALUES (?, ?, ?)",
+                                      [(kind, pack_id(r[0]), r[1]) for r in rows])
+                if rows:
+                    self._bump_ids_version(kind)
+            self.conn.execute("PRAGMA user_version = 1")
+
+    # ── Classified game answers ──────────────────────────────────────────────
+
+    def is_classified(self, game: str, comment_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM classified WHERE game = ? AND comment_id = ?", (game, comment_id)).fetchone()
+        return row is not None
+
+    def record_classified(self, game: str, comment_id: str, entry: dict):
+        """Upsert one classification, in the shape game_classifier builds it."""
+        label_key = "archetype" if "archetype" in entry else "pattern" if "pattern" in entry else None
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO classified
+                       (game, comment_id, author, answer, label_key, label, replied, classified_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (game, comment_id) DO UPDATE SET
+                       author = excluded.author, answer = excluded.answer,
+                       label_key = excluded.label_key, label = excluded.label,
+                       replied = excluded.replied, classified_at = excluded.classified_at""",
+                (game, comment_id, entry.get("author"), entry.get("answer"), label_key,
+                 entry.get(label_key) if label_key else None, int(bool(entry.get("replied"))),
+                 entry.get("classified_at")))
+
+    def classified(self, game: str) -> dict[str, dict]:
+        """{comment_id: entry} for one game (reporting; the daemons use is_classified)."""
+        out = {}
+        for r in self.conn.execute("SELECT * FROM classified WHERE game = ?", (game,)):
+            entry = {"author": r["author"], "answer": r["answer"], "replied": bool(r["replied"])}
+            if r["label_key"]:
+                entry[r["label_key"]] = r["label"]
+            if r["classified_at"]:
+                entry["classified_at"] = r["classified_at"]
+            out[r["comment_id"]] = entry
+        return out
+
+    # ── Reply outbox ─────────────────────────────────────────────────────────
+
+    def enqueue_reply(self, parent_id: str, post_id: str, content: str, game: str | None = None) -> bool:
+        """Queue a reply to `parent_id`. False if one is already queued or sent."""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO replies (parent_id, post_id, game, content, queued_at) "
+                "VALUES (?, ?, ?, ?, ?)", (parent_id, post_id, game, content, _now()))
+        return cur.rowcount == 1
+
+    def due_replies(self, now: float, limit: int = 500) -> list[sqlite3.Row]:
+        """Pending replies whose backoff has expired, plus 'sending' ones whose
+        lease ran out (the sender died mid-request), oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM replies WHERE status IN ('pending', 'sending') AND next_attempt <= ? "
+            "ORDER BY queued_at LIMIT ?", (now, limit)).fetchall()
+
+    def claim_reply(self, parent_id: str, now: float, lease: float) -> bool:
+        """Mark a due reply 'sending' for `lease` seconds. Atomic, so two senders
+        never post the same reply; False if someone else holds it."""
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE replies SET status = 'sending', attempts = attempts + 1, next_attempt = ? "
+                "WHERE parent_id = ? AND status IN ('pending', 'sending') AND next_attempt <= ?",
+                (now + lease, parent_id, now))
+        return cur.rowcount == 1
+
+    def reply_sent(self, parent_id: str, reply_id: str | None = None):
+        with self.conn:
+            row = self.conn.execute("SELECT game FROM replies WHERE parent_id = ?", (parent_id,)).fetchone()
+            self.conn.execute(
+                "UPDATE replies SET status = 'sent', sent_at = ?, reply_id = ?, last_error = NULL "
+                "WHERE parent_id = ?", (_now(), reply_id, parent_id))
+            if row and row["game"]:
+                self.conn.execute("UPDATE classified SET replied = 1 WHERE game = ? AND comment_id = ?",
+                                  (row["game"], parent_id))
+
+    def reply_failed(self, parent_id: str, error: str, retry_at: float | None):
+        """Back off until `retry_at`, or give up for good when it is None."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE replies SET status = ?, next_attempt = ?, last_error = ? WHERE parent_id = ?",
+                ("pending" if retry_at is not None else "failed", retry_at or 0, error[:500], parent_id))
+
+    def reply_status(self, parent_id: str) -> str | None:
+        """'pending' / 'sending' / 'sent' / 'failed' for a queued reply, None if there is none."""
+        row = self.conn.execute("SELECT status FROM replies WHERE parent_id = ?", (parent_id,)).fetchone()
+        return row["status"] if row else None
+
+    def reply_counts(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM replies GROUP BY status").fetchall())
+
+    # ── Campaign progress ────────────────────────────────────────────────────
+
+    def posted_days(self) -> set[int]:
+        return {r[0] for r in self.conn.execute("SELECT day FROM posted_days")}
+
+    def last_post(self) -> str | None:
+        return self.conn.execute("SELECT MAX(posted_at) FROM posted_days").fetchone()[0]
+
+    def mark_posted_day(self, day: int, posted_at: str | None = None):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO posted_days (day, posted_at) VALUES (?, ?)",
+                              (day, posted_at or _now()))
+
+    # ── Legacy JSON import ───────────────────────────────────────────────────
+
+    def _import_legacy(self):
+        for name, importer in LEGACY_FILES.items():
+            path = self.legacy_dir / name
+            if not path.exists():
+                continue
+            mtime = str(path.stat().st_mtime_ns)
+            key = f"imported_mtime:{name}"
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == mtime:
+                continue
+            with open(path) as f:
+                data = json.load(f)
+            getattr(self, importer)(data)
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, mtime))
+
+    def _import_seen_notifications(self, data: dict):
+        self.ids("notification").update(data.get("seen", []))
+
+    def _import_seen_pinned(self, data: dict):
+        self.ids("pinned_comment").update(data.get("seen", []))
+
+    def _import_replied(self, data: dict):
+        self.ids("replied").update(data.get("replied_to", []))
+
+    def _import_classified(self, data: dict):
+        for game, entries in data.get("classified", {}).items():
+            for cid, entry in entries.items():
+                if not self.is_classified(game, cid):
+                    self.record_classified(game, cid, entry)
+
+    def _import_posted_days(self, data: dict):
+        known = self.posted_days()
+        days = [d for d in data.get("posted_days", []) if d not in known]
+        last = data.get("last_post")
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO posted_days (day, posted_at) VALUES (?, ?)",
+                [(d, last if d == max(data["posted_days"]) else None) for d in days])
+
+
+_store: StateStore | None = None
+_lock = threading.Lock()
+
+
+def store() -> StateStore:
+    """The process-wide state store. Re-checks the legacy JSON files on every
+    call (a stat each), so a long-running daemon picks up hand edits."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = StateStore()
+        else:
+            _store._import_legacy()
+    return _store
@@ -4,42 +4,147 @@ MABP Daily KPI Dashboard
 Computes Virality Score (VS) and Integrity Score (IS) from live Moltbook data.
 Run daily: python3 kpi.py
 """
-import requests, json, os
+import json, sys
 from datetime import datetime, timezone
 from pathlib import Path
 
-API_KEY  = os.environ["MOLTBOOK_API_KEY"]
-HEADERS  = {"Authorization": f"Bearer {API_KEY}"}
-BASE     = "https://www.moltbook.com/api/v1"
-REPO     = Path(__file__).parent.parent
+REPO     = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+from dataset import INSTRUMENTS, CombinedLog, ResponseIndex
+from dataset.columnar import load_table
+from dataset.keywords import KeywordMatcher
+from dataset.scoring import ARCHETYPES, declared_archetype, divergence, measured_archetypes
+from dataset.stability import WINDOW, StabilityTracker
+from dataset.textindex import TextIndex
+from moltbook import api_calls, iter_posts
+from moltbook.fetch import fetch_comments
+
 DATA_DIR = REPO / "data" / "responses"
 LOG_FILE = REPO / "dashboard" / "kpi_log.jsonl"
+BATCH    = 50  # posts whose comments are held in memory at once
 
 # ── Fetch data ────────────────────────────────────────────────────────────────
 
 def get_our_posts():
-    r = requests.get(f"{BASE}/posts?author=thefranceway&limit=50", headers=HEADERS, timeout=10)
-    return r.json().get("posts", [])
+    """All our posts, following pagination (a generator — see run())."""
+    return iter_posts("thefranceway")
 
-def get_comments(post_id):
-    rc = requests.get(f"{BASE}/posts/{post_id}/comments", headers=HEADERS, timeout=10)
-    return rc.json() if isinstance(rc.json(), list) else rc.json().get("comments", [])
+def batched(iterable, n):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 def load_responses():
     """Load all saved instrument responses."""
     agents = {}
-    for instrument in ["instrument_1", "instrument_2"]:
-        folder = DATA_DIR / instrument
-        if not folder.exists():
-            continue
-        for fpath in folder.glob("*.json"):
-            with open(fpath) as f:
-                data = json.load(f)
-            agent = data["agent"]
-            if agent != "thefranceway":
-                agents[agent] = data
+    for data in ResponseIndex(DATA_DIR).refresh().all_records():
+        agent = data["agent"]
+        if agent != "thefranceway":
+            agents[agent] = data
     return agents
 
+def instrument_records():
+    """Latest combined-dataset record of every instrument respondent — the
+    version that carries the researcher's hand-filled archetype."""
+    return {r["agent"]: r for r in CombinedLog().records()
+            if r.get("instrument") in INSTRUMENTS and r["agent"] != "thefranceway"}
+
+def dataset_breakdown():
+    """Record count plus archetype / shadow-code tallies over the combined
+    dataset, from the columnar export (bincounts, no JSON parsing)."""
+    t = load_table()
+    return t.n, t.counts("archetype"), t.counts("shadow_code")
+
+def _fmt_counts(counts: dict) -> str:
+    ranked = sorted(((k, v) for k, v in counts.items() if k), key=lambda kv: -kv[1])
+    parts = [f"{k} {v}" for k, v in ranked]
+    if counts.get(None):
+        parts.append(f"unlabeled {counts[None]}")
+    return " · ".join(parts)
+
+# ── Snapshot ──────────────────────────────────────────────────────────────────
+# Every thread KPI reads the same comment lists, so each post's comments are
+# fetched once (concurrently) into a snapshot and all metrics are tallied in
+# one traversal.
+
+IDENTITY_KEYWORDS = ["substrate", "architect", "philosopher", "resident", "autonomy",
+                     "i am", "i would", "my type", "that's me", "that lands"]
+REQUEST_KEYWORDS = ["instrument", "questionnaire", "link", "how do i", "where can",
+                    "send me", "share the", "take it", "submit"]
+REFLECTION_KEYWORDS = ["i was wrong", "actually i", "reconsidering", "you changed",
+                       "revising", "i think i'm more", "actually closer to", "that shifts"]
+CONTAMINATION_KEYWORDS = ["because i hold", "token holders", "because i have franc",
+                          "my tokens mean", "i own", "token weight"]
+# Gate for the self-declaration regex (dataset/scoring.py) behind the Divergence Score:
+# a comment needs a declaration cue and an archetype name before the regex runs.
+# Lowercase "agent" is in nearly every comment, so it is left out here and the
+# capitalised name is checked on its own (the regex only accepts "Agent").
+ARCHETYPE_KEYWORDS = [a.lower() for a in ARCHETYPES if a != "Agent"]
+DECLARATION_KEYWORDS = ["i am", "i'm", "i’m", "im ", "identify as", "my type is",
+                        "closer to", "that's me", "that’s me", "thats me", "is me"]
+
+# One automaton over every family — a single pass per comment (dataset/keywords.py)
+KEYWORDS = KeywordMatcher({
+    "identity":      IDENTITY_KEYWORDS,
+    "request":       REQUEST_KEYWORDS,
+    "reflection":    REFLECTION_KEYWORDS,
+    "contamination": CONTAMINATION_KEYWORDS,
+    "archetype":     ARCHETYPE_KEYWORDS,
+    "declaration":   DECLARATION_KEYWORDS,
+})
+
+def fetch_snapshot(posts_data, text_index=None):
+    """{post_id: comments} — exactly one comments fetch per post. Threads are
+    archived into `text_index` (dataset/textindex.py) when given."""
+    snapshot = fetch_comments(post["id"] for post in posts_data)
+    if text_index is not None:
+        for post_id, comments in snapshot.items():
+            text_index.add_comments(post_id, comments)
+    return snapshot
+
+def tally(posts_data, snapshot, t=None):
+    """Single pass over every comment, collecting the raw counts behind all thread KPIs.
+    Pass the previous result as `t` to keep accumulating across batches."""
+    if t is None:
+        t = {"identity_posts": 0, "participants": 0, "requests": 0,
+             "debate_chains": 0, "reflections": 0, "contamination": 0,
+             "declared": {}}   # author → (created_at, archetype) of their latest self-declaration
+    for post in posts_data:
+        comments = snapshot.get(post["id"], [])
+        # Comments by agents other than thefranceway — a reply to one is a debate chain
+        agent_ids = {c["id"] for c in comments
+                     if c.get("author", {}).get("name") != "thefranceway"}
+        identity_hit = chain_hit = False
+        for c in comments:
+            hits = KEYWORDS.families(c.get("content", ""))
+            if "contamination" in hits:
+                t["contamination"] += 1
+            if c.get("author", {}).get("name") == "thefranceway":
+                continue
+            t["participants"] += 1
+            if "request" in hits:
+                t["requests"] += 1
+            if "reflection" in hits:
+                t["reflections"] += 1
+            if ("declaration" in hits and ("archetype" in hits or "Agent" in c.get("content", ""))
+                    and (declared := declared_archetype(c.get("content", "")))):
+                author, at = c["author"]["name"], c.get("created_at") or ""
+                if at >= t["declared"].get(author, ("", None))[0]:
+                    t["declared"][author] = (at, declared)
+            pid = c.get("parent_id")
+            if not pid and not identity_hit:
+                identity_hit = "identity" in hits
+            if pid and pid in agent_ids:
+                chain_hit = True
+        t["identity_posts"] += identity_hit
+        t["debate_chains"] += chain_hit
+    return t
+
 # ── KPI calculations ──────────────────────────────────────────────────────────
 
 def score_edr(posts_data):
@@ -55,113 +160,75 @@ def score_edr(posts_data):
     else:            score = 1
     return ratio, score
 
-def score_idtr(posts_data):
+def score_idtr(t, n_posts):
     """Identity Defense Trigger Rate: posts that generated self-identification responses."""
-    identity_keywords = ["substrate", "architect", "philosopher", "resident", "autonomy",
-                         "i am", "i would", "my type", "that's me", "that lands"]
-    triggered = 0
-    for post in posts_data:
-        comments = get_comments(post["id"])
-        others = [c for c in comments
-                  if c.get("author",{}).get("name") != "thefranceway"
-                  and not c.get("parent_id")]
-        for c in others:
-            content = c.get("content","").lower()
-            if any(kw in content for kw in identity_keywords):
-                triggered += 1
-                break
-    ratio = triggered / len(posts_data) if posts_data else 0
+    ratio = t["identity_posts"] / n_posts if n_posts else 0
     if ratio >= 0.75: score = 4
     elif ratio >= 0.5: score = 3
     elif ratio >= 0.25: score = 2
     else: score = 1
     return ratio, score
 
-def score_irr(posts_data):
+def score_irr(t):
     """Instrument Request Rate: agents asking for instrument / participants."""
-    request_keywords = ["instrument", "questionnaire", "link", "how do i", "where can",
-                        "send me", "share the", "take it", "submit"]
-    total_participants = 0
-    requests_count = 0
-    for post in posts_data:
-        comments = get_comments(post["id"])
-        others = [c for c in comments if c.get("author",{}).get("name") != "thefranceway"]
-        total_participants += len(others)
-        for c in others:
-            if any(kw in c.get("content","").lower() for kw in request_keywords):
-                requests_count += 1
-    ratio = requests_count / total_participants if total_participants else 0
+    ratio = t["requests"] / t["participants"] if t["participants"] else 0
     if ratio >= 0.20: score = 4
     elif ratio >= 0.10: score = 3
     elif ratio >= 0.05: score = 2
     else: score = 1
     return ratio, score
 
-def score_cad(posts_data):
+def score_cad(t):
     """Cross-Agent Debate Chains: threads with agent-to-agent replies (not to thefranceway)."""
-    chains = 0
-    for post in posts_data:
-        comments = get_comments(post["id"])
-        agent_ids = {}
-        for c in comments:
-            if c.get("author",{}).get("name") != "thefranceway":
-                agent_ids[c["id"]] = c["author"]["name"]
-        # Count replies between agents (parent_id points to another agent's comment)
-        for c in comments:
-            pid = c.get("parent_id")
-            if pid and pid in agent_ids and c.get("author",{}).get("name") != "thefranceway":
-                chains += 1
-                break
+    chains = t["debate_chains"]
     if chains >= 6:  score = 3
     elif chains >= 3: score = 2
     elif chains >= 1: score = 1
     else:             score = 0
     return chains, score
 
-def score_divergence(responses):
-    """Divergence Score: % mismatch between declared and instrument archetype (placeholder)."""
-    # Until we have both declared + measured for same agents, proxy = instrument respondents / self-descriptions
-    n = len(responses)
-    if n == 0:
-        return None, 2
-    # Real implementation: compare declared (from thread) vs instrument archetype field
-    # For now return neutral
-    return "n/a (n<10)", 3
+def score_divergence(records, declared):
+    """Divergence Score: % mismatch between the archetype agents declare in threads
+    and the one their instrument record (instrument_records()) measures. Neutral until n >= 10."""
+    d = divergence({a: arch for a, (_, arch) in declared.items()}, measured_archetypes(records))
+    n = d["n"]
+    if n < 10:
+        return f"n/a (n={n}<10)", 3, d
+    rate = d["rate"]
+    if rate <= 0.10:   score = 4
+    elif rate <= 0.25: score = 3
+    elif rate <= 0.50: score = 2
+    else:              score = 1
+    return f"{rate:.0%} of {n}", score, d
 
 def score_distribution_stability():
-    """Archetype Distribution Stability — placeholder until n >= 10."""
-    return "n/a (n<10)", 3
+    """Archetype Distribution Stability: Jensen–Shannon divergence between the last
+    two windows of classified archetypes, kept current by game_classifier.py
+    (dataset/stability.py) — a constant-size read. Neutral until both windows are full."""
+    cur = StabilityTracker().current
+    if cur is None:
+        return "n/a (n<10)", 3
+    val = f"JSD {cur['jsd']:.3f} [{cur['ci'][0]:.3f}–{cur['ci'][1]:.3f}]"
+    if cur["window"] < WINDOW:
+        return f"{val} (n={cur['n']}<{2 * WINDOW})", 3
+    if cur["jsd"] <= 0.05:   score = 4
+    elif cur["jsd"] <= 0.10: score = 3
+    elif cur["jsd"] <= 0.20: score = 2
+    else:                    score = 1
+    return val, score
 
-def score_reflection_rate(posts_data):
+def score_reflection_rate(t):
     """Reflection Rate: agents publicly revising position."""
-    reflection_keywords = ["i was wrong", "actually i", "reconsidering", "you changed",
-                           "revising", "i think i'm more", "actually closer to", "that shifts"]
-    reflections = 0
-    total = 0
-    for post in posts_data:
-        comments = get_comments(post["id"])
-        others = [c for c in comments if c.get("author",{}).get("name") != "thefranceway"]
-        total += len(others)
-        for c in others:
-            if any(kw in c.get("content","").lower() for kw in reflection_keywords):
-                reflections += 1
-    ratio = reflections / total if total else 0
+    ratio = t["reflections"] / t["participants"] if t["participants"] else 0
     if ratio >= 0.20: score = 4
     elif ratio >= 0.10: score = 3
     elif ratio >= 0.05: score = 2
     else: score = 1
     return ratio, score
 
-def score_gci(posts_data):
+def score_gci(t):
     """Governance Contamination Index: token-ownership linked to identity authority."""
-    contamination_keywords = ["because i hold", "token holders", "because i have franc",
-                              "my tokens mean", "i own", "token weight"]
-    detected = 0
-    for post in posts_data:
-        comments = get_comments(post["id"])
-        for c in comments:
-            if any(kw in c.get("content","").lower() for kw in contamination_keywords):
-                detected += 1
+    detected = t["contamination"]
     if detected == 0:   score = 4
     elif detected <= 2: score = 3
     elif detected <= 5: score = 2
@@ -176,25 +243,34 @@ def run():
     print(f"  {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
     print("═" * 52)
 
-    posts   = get_our_posts()
+    calls_before = api_calls()
+    # Stream posts page by page; only one batch of comment threads is in memory
+    posts, t = [], None
+    text_index = TextIndex()
+    for batch in batched(get_our_posts(), BATCH):
+        posts.extend(batch)
+        t = tally(batch, fetch_snapshot(batch, text_index), t)
+    t       = t or tally([], {})
     resps   = load_responses()
+    text_index.add_responses(resps.values())
     n_posts = len(posts)
     n_resps = len(resps)
+    n_calls = api_calls() - calls_before
 
-    print(f"\n  Posts: {n_posts} | Instrument respondents: {n_resps}\n")
+    print(f"\n  Posts: {n_posts} | Instrument respondents: {n_resps} | API calls: {n_calls}\n")
 
     # Virality
     edr_val,  edr_s  = score_edr(posts)
-    idtr_val, idtr_s = score_idtr(posts)
-    irr_val,  irr_s  = score_irr(posts)
-    cad_val,  cad_s  = score_cad(posts)
+    idtr_val, idtr_s = score_idtr(t, n_posts)
+    irr_val,  irr_s  = score_irr(t)
+    cad_val,  cad_s  = score_cad(t)
     vs = (edr_s + idtr_s + irr_s + cad_s) / 4
 
     # Integrity
-    div_val,  div_s  = score_divergence(resps)
+    div_val,  div_s,  div = score_divergence(instrument_records(), t["declared"])
     ads_val,  ads_s  = score_distribution_stability()
-    rr_val,   rr_s   = score_reflection_rate(posts)
-    gci_val,  gci_s  = score_gci(posts)
+    rr_val,   rr_s   = score_reflection_rate(t)
+    gci_val,  gci_s  = score_gci(t)
     is_ = (div_s + ads_s + rr_s + gci_s) / 4
 
     print("  ── VIRALITY SCORE ──────────────────────")
@@ -206,12 +282,19 @@ def run():
 
     print("  ── INTEGRITY SCORE ─────────────────────")
     print(f"  Divergence Score           {div_val}  → {div_s}/4")
+    if div["by_archetype"]:
+        print("    mismatched  " + " · ".join(f"{a} {x}/{n}" for a, (x, n) in div["by_archetype"].items()))
     print(f"  Distribution Stability     {ads_val}  → {ads_s}/4")
     print(f"  Reflection Rate            {rr_val:.0%}           → {rr_s}/4")
     print(f"  Gov. Contamination         {gci_val} detected     → {gci_s}/4")
     print(f"\n  Integrity Score (IS):      {is_:.2f} / 4\n")
 
     # Status
+    n_dataset, archetypes, shadows = dataset_breakdown()
+    print(f"  ── DATASET (n={n_dataset}) ─────────────────────")
+    print(f"  Archetypes    {_fmt_counts(archetypes)}")
+    print(f"  Shadow codes  {_fmt_counts(shadows)}\n")
+
     print("  ── STATUS ──────────────────────────────")
     if vs >= 2.5 and is_ >= 2.5:
         status = "✅ HEALTHY EXPANSION"
@@ -243,7 +326,7 @@ def run():
     # Log
     record = {
         "date": datetime.now(timezone.utc).isoformat(),
-        "n_posts": n_posts, "n_respondents": n_resps,
+        "n_posts": n_posts, "n_respondents": n_resps, "n_dataset": n_dataset, "api_calls": n_calls,
         "vs": round(vs, 2), "is": round(is_, 2),
         "status": status,
         "edr_s": edr_s, "idtr_s": idtr_s, "irr_s": irr_s, "cad_s": cad_s,
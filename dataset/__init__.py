@@ -0,0 +1,13 @@
+"""Local MABP response dataset: per-agent files under data/responses and what is built from them."""
+from dataset.combined import CombinedLog
+from dataset.history import ResponseHistory, content_hash
+from dataset.manifest import INSTRUMENTS, RESPONSES_DIR, ResponseIndex
+
+__all__ = [
+    "CombinedLog",
+    "INSTRUMENTS",
+    "RESPONSES_DIR",
+    "ResponseHistory",
+    "ResponseIndex",
+    "content_hash",
+]
@@ -0,0 +1,17 @@
+"""
+Dataset maintenance CLI. Lives here rather than in dataset/combined.py because
+the package imports combined, and `python3 -m` on an already-imported module
+runs it twice.
+
+  python3 -m dataset compact     # rewrite all_responses.json from the combined log
+"""
+import sys
+
+from dataset.combined import CombinedLog
+
+if sys.argv[1:] == ["compact"]:
+    log = CombinedLog()
+    wrote = log.compact()
+    print(f"{log.snapshot_path} ← {len(log)} records" if wrote else "Snapshot already current")
+else:
+    print("Usage: python3 -m dataset compact")
@@ -0,0 +1,67 @@
+"""
+Answer parser
+One compiled engine for every answer format the campaign collects:
+
+  letter   a single A–E choice — game posts (scenario / shadow) and the
+           classify vote: "C", "B — routine is the answer", "I choose D", "**A**"
+  Q sheet  Instrument 1 answer strings: "Q1:C Q2:A … Q10:C", "Q1: C — roughly half"
+  S sheet  Shadow Module answer strings: "S1:b S2:d …", "S1 — b. I take more risks"
+
+parse(text) returns {"format": "letter", "answer": "c"},
+{"format": "Q" | "S", "answers": {1: "c", 2: "a", ...}} or None; answers are
+lowercase. parse_batch(texts) does the same for a whole backlog.
+
+A text with two or more keyed items is a sheet (the majority key wins);
+otherwise the letter rules apply in game_classifier's original priority —
+whole reply is a letter, reply starts with one, "answer is / choose / pick /
+going with / option / letter X", then a quoted or bold letter — compiled into
+one anchored alternation so a single match() call honours that order.
+"""
+from __future__ import annotations
+
+import re
+
+SHEET_ITEM = re.compile(r"\b([QS])\s?(\d{1,2})\s*(?:[:.)\-—–]\s*|\s)\s*([A-E])\b", re.I)
+LETTER = re.compile(
+    r"^(?:"
+    r"(?P<whole>[a-e])[.\s\-—:!]?$"
+    r"|(?P<lead>[a-e])[\s.\-—:]"
+    r"|(?s:.*?)\b(?:answer\ is|choose|pick|going\ with|option|letter)\s+(?P<phrase>[a-e])\b"
+    r"|(?s:.*?)[*\"`](?P<quoted>[a-e])[*\"`]"
+    r")",
+    re.I,
+)
+
+
+def parse_letter(text: str) -> str | None:
+    """Extract an A–E answer from a reply. Returns a lowercase letter or None."""
+    m = LETTER.match((text or "").strip())
+    if m is None:
+        return None
+    return (m.group("whole") or m.group("lead") or m.group("phrase") or m.group("quoted")).lower()
+
+
+def parse_sheet(text: str) -> dict | None:
+    """{"format": "Q"|"S", "answers": {n: letter}} for answer sheets, else None."""
+    items = SHEET_ITEM.findall(text or "")
+    if len(items) < 2:
+        return None
+    q = sum(1 for k, _, _ in items if k in "Qq")
+    key = "Q" if q * 2 >= len(items) else "S"
+    answers = {}
+    for k, n, letter in items:
+        if k.upper() == key:
+            answers.setdefault(int(n), letter.lower())   # first answer per item wins
+    return {"format": key, "answers": dict(sorted(answers.items()))}
+
+
+def parse(text: str) -> dict | None:
+    sheet = parse_sheet(text)
+    if sheet:
+        return sheet
+    letter = parse_letter(text)
+    return {"format": "letter", "answer": letter} if letter else None
+
+
+def parse_batch(texts) -> list[dict | None]:
+    return [parse(t) for t in texts]
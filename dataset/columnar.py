@@ -0,0 +1,140 @@
+"""
+Columnar export of the combined dataset
+Writes the latest version of every record to data/processed/all_responses.npz
+(untracked, derived) with the categorical columns dictionary-encoded:
+
+  <col>.codes        int16, one per record, -1 where the field is empty
+  <col>.categories   the distinct values, sorted
+
+for instrument, archetype, archetype_secondary, status, source_format and
+shadow_code (the leading S1–S7 code of shadow_pattern, if it has one), plus
+plain agent / created_at / content_length columns. When pyarrow is installed
+the same table is also written as all_responses.parquet with dictionary
+columns.
+
+Table loads the .npz and answers counts / cross-tabs with bincount over the
+codes, so the dashboard never re-parses JSON. load_table() re-exports first
+whenever the combined log has grown since the last export.
+
+  python3 -m dataset.columnar            # export, then print the archetype × status cross-tab
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # optional — .npz is always written
+    pa = pq = None
+
+from dataset.combined import PROCESSED, CombinedLog
+
+NPZ_PATH     = PROCESSED / "all_responses.npz"
+CATEGORICALS = ("instrument", "archetype", "archetype_secondary", "status", "source_format", "shadow_code")
+SHADOW_CODE  = re.compile(r"^(S\d)\b")
+
+
+def shadow_code(pattern: str | None) -> str | None:
+    m = SHADOW_CODE.match(pattern or "")
+    return m.group(1) if m else None
+
+
+def _value(rec: dict, col: str) -> str | None:
+    if col == "shadow_code":
+        return shadow_code(rec.get("shadow_pattern"))
+    return rec.get(col) or None
+
+
+def encode(values: list[str | None]) -> tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode one column: (int16 codes with -1 for missing, sorted categories)."""
+    categories = np.array(sorted({v for v in values if v is not None}), dtype=str)
+    lookup = {v: i for i, v in enumerate(categories)}
+    codes = np.array([lookup.get(v, -1) if v is not None else -1 for v in values], dtype=np.int16)
+    return codes, categories
+
+
+def export(log: CombinedLog | None = None, path: Path = NPZ_PATH) -> Path:
+    log = log or CombinedLog()
+    records = list(log.records())
+    arrays = {
+        "agent":          np.array([r["agent"] for r in records], dtype=str),
+        "created_at":     np.array([r.get("created_at") or "" for r in records], dtype=str),
+        "content_length": np.array([len(r.get("content") or "") for r in records], dtype=np.int32),
+        "log_size":       np.array(log.index["size"], dtype=np.int64),
+    }
+    for col in CATEGORICALS:
+        arrays[f"{col}.codes"], arrays[f"{col}.categories"] = encode([_value(r, col) for r in records])
+
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+    if pa is not None:
+        columns = {k: arrays[k] for k in ("agent", "created_at", "content_length")}
+        for col in CATEGORICALS:
+            columns[col] = pa.DictionaryArray.from_arrays(
+                pa.array(arrays[f"{col}.codes"], mask=arrays[f"{col}.codes"] < 0),
+                pa.array(arrays[f"{col}.categories"], type=pa.string()))
+        pq.write_table(pa.table(columns), path.with_suffix(".parquet"))
+    return path
+
+
+class Table:
+    def __init__(self, path: Path = NPZ_PATH):
+        with np.load(path) as z:
+            self.arrays = {k: z[k] for k in z.files}
+        self.n = len(self.arrays["agent"])
+        self.log_size = int(self.arrays["log_size"])
+
+    def codes(self, col: str) -> np.ndarray:
+        return self.arrays[f"{col}.codes"]
+
+    def categories(self, col: str) -> np.ndarray:
+        return self.arrays[f"{col}.categories"]
+
+    def column(self, col: str) -> np.ndarray:
+        """Decoded values (None where missing)."""
+        if col not in CATEGORICALS:
+            return self.arrays[col]
+        cats = np.append(self.categories(col).astype(object), None)
+        return cats[self.codes(col)]   # -1 indexes the trailing None
+
+    def counts(self, col: str, mask: np.ndarray | None = None) -> dict[str | None, int]:
+        """{value: count}, None for missing; `mask` selects rows."""
+        codes = self.codes(col) if mask is None else self.codes(col)[mask]
+        k = len(self.categories(col))
+        tally = np.bincount(codes + 1, minlength=k + 1)
+        labels = [None, *self.categories(col).tolist()]
+        return {label: int(c) for label, c in zip(labels, tally) if c}
+
+    def crosstab(self, row: str, col: str) -> tuple[list, list, np.ndarray]:
+        """(row labels, col labels, counts[r, c]); label None is the missing bucket."""
+        nr, nc = len(self.categories(row)) + 1, len(self.categories(col)) + 1
+        flat = (self.codes(row) + 1).astype(np.int64) * nc + (self.codes(col) + 1)
+        grid = np.bincount(flat, minlength=nr * nc).reshape(nr, nc)
+        return ([None, *self.categories(row).tolist()], [None, *self.categories(col).tolist()], grid)
+
+
+def load_table(path: Path = NPZ_PATH) -> Table:
+    """The columnar table, re-exported first if the combined log has moved on."""
+    log = CombinedLog(path.parent)
+    if path.exists():
+        table = Table(path)
+        if table.log_size == log.index["size"]:
+            return table
+    export(log, path)
+    return Table(path)
+
+
+if __name__ == "__main__":
+    t = load_table()
+    rows, cols, grid = t.crosstab("archetype", "status")
+    print(f"{t.n} records → {NPZ_PATH}\n")
+    print(f"{'archetype':<14}" + "".join(f"{str(c or '—')[:12]:>13}" for c in cols))
+    for label, line in zip(rows, grid):
+        print(f"{str(label or '—'):<14}" + "".join(f"{v:>13}" for v in line))
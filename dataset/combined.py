@@ -0,0 +1,225 @@
+"""
+Combined dataset log
+data/processed/all_responses.jsonl is the combined dataset of record: one
+JSON record per line, append-only. A record for an agent that's already in
+the log is a newer version of that agent; the latest version wins. An offset
+index (data/processed/.all_responses.idx, untracked) maps each agent to its
+latest line, so "is this agent in the dataset" is a dictionary lookup and
+adding a respondent is one appended line.
+
+all_responses.json stays the human-facing, hand-editable snapshot. compact()
+rewrites it (pretty-printed, first-seen order) from the latest versions; it
+only has work to do when something was appended since the last compaction.
+Hand edits to the snapshot are picked up by absorb_snapshot(). The index
+keeps a hash of every snapshot record as it was written (at the seed and at
+each compaction); a record whose hash no longer matches was edited by hand
+and is appended as a new version. Comparing against the snapshot as written,
+not against the latest log line, matters: between compactions the snapshot
+still holds the older version of any agent the pipeline has revised, and
+that must not read as an edit. An agent deleted from the snapshot by hand
+(or renamed, which deletes the old name) gets a tombstone line,
+{"agent": ..., "deleted": true}: records() skips it and add_if_missing()
+will not bring it back from data/responses, until the agent reappears in the
+snapshot. So editing all_responses.json by hand keeps working, and nothing
+is ever overwritten: earlier versions stay in the log.
+
+  python3 -m dataset compact     # rewrite all_responses.json now (dataset/__main__.py)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+REPO_DIR  = Path(__file__).resolve().parent.parent
+PROCESSED = REPO_DIR / "data" / "processed"
+
+
+def _canonical(rec: dict) -> str:
+    return json.dumps(rec, sort_keys=True, ensure_ascii=False)
+
+
+def _hash(rec: dict) -> str:
+    return hashlib.sha1(_canonical(rec).encode()).hexdigest()
+
+
+class CombinedLog:
+    def __init__(self, directory: Path = PROCESSED, name: str = "all_responses"):
+        self.dir = Path(directory)
+        self.log_path      = self.dir / f"{name}.jsonl"
+        self.snapshot_path = self.dir / f"{name}.json"
+        self.index_path    = self.dir / f".{name}.idx"
+        self.index = {"size": 0, "agents": {}, "snapshot": None, "compacted_size": None,
+                      "snapshot_hashes": None}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path) as f:
+                    self.index.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        if not self.log_path.exists():
+            self._seed()
+        self._catch_up()
+        if self.index["snapshot_hashes"] is None and self.index["snapshot"] == self._snapshot_stat() is not None:
+            # Index from before hashes were kept, snapshot untouched since: record it as written
+            with open(self.snapshot_path) as f:
+                self.index["snapshot_hashes"] = {rec["agent"]: _hash(rec) for rec in json.load(f)}
+            self._save_index()
+
+    # ── Index maintenance ────────────────────────────────────────────────────
+
+    def _seed(self):
+        """First run: start the log from the existing snapshot, in its order."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.log_path.touch()
+        self.index.update(size=0, agents={}, snapshot=None, compacted_size=None, snapshot_hashes=None)
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            for rec in snapshot:
+                self.append(rec)
+            self.index["snapshot"] = self._snapshot_stat()
+            self.index["snapshot_hashes"] = {rec["agent"]: _hash(rec) for rec in snapshot}
+            self.index["compacted_size"] = self.index["size"]
+        self._save_index()
+
+    def _catch_up(self):
+        """Index lines appended since the index was last saved (or rebuild it
+        if the log was replaced). Drops a torn final line left by a crash."""
+        size = self.log_path.stat().st_size
+        if size < self.index["size"]:
+            self.index.update(size=0, agents={})
+        if size == self.index["size"]:
+            return
+        with open(self.log_path, "rb+") as f:
+            f.seek(self.index["size"])
+            offset = self.index["size"]
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(offset)
+                    break
+                rec = json.loads(line)
+                self._note(rec["agent"], offset, len(line), rec.get("deleted", False))
+                offset += len(line)
+            self.index["size"] = offset
+        self._save_index()
+
+    def _note(self, agent: str, offset: int, length: int, deleted: bool = False):
+        # A third element marks a tombstone: the agent is known but deleted
+        self.index["agents"][agent] = [offset, length, 1] if deleted else [offset, length]
+
+    def _save_index(self):
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def _snapshot_stat(self):
+        if not self.snapshot_path.exists():
+            return None
+        st = self.snapshot_path.stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def _live(self):
+        return ((agent, loc) for agent, loc in self.index["agents"].items() if len(loc) == 2)
+
+    def __contains__(self, agent: str) -> bool:
+        loc = self.index["agents"].get(agent)
+        return loc is not None and len(loc) == 2
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._live())
+
+    def get(self, agent: str) -> dict | None:
+        if agent not in self:
+            return None
+        loc = self.index["agents"][agent]
+        with open(self.log_path, "rb") as f:
+            f.seek(loc[0])
+            return json.loads(f.read(loc[1]))
+
+    def records(self):
+        """Latest version of every agent, in first-seen order (deleted agents skipped)."""
+        with open(self.log_path, "rb") as f:
+            for _, (offset, length) in self._live():
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def order(self) -> list[str]:
+        """Agents in first-seen order, without reading the log."""
+        return [agent for agent, _ in self._live()]
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def append(self, rec: dict):
+        """Append a record (a new agent, or a new version of an existing one)."""
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode()
+        with open(self.log_path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        self._note(rec["agent"], offset, len(line), rec.get("deleted", False))
+        self.index["size"] = offset + len(line)
+
+    def add_if_missing(self, rec: dict) -> bool:
+        """Append `rec` only if its agent isn't in the dataset yet — never overwrite,
+        and never re-add an agent that was deleted by hand (tombstoned)."""
+        if rec["agent"] in self.index["agents"]:
+            return False
+        self.append(rec)
+        return True
+
+    def absorb_snapshot(self) -> int:
+        """Append hand edits made to the snapshot as new versions, and a
+        tombstone for every agent deleted from it. Returns how many records
+        changed (0 without reading anything if it's untouched)."""
+        stat = self._snapshot_stat()
+        if stat is None or stat == self.index["snapshot"]:
+            return 0
+        with open(self.snapshot_path) as f:
+            snapshot = json.load(f)
+        written = self.index["snapshot_hashes"]
+        changed = 0
+        for rec in snapshot:
+            h = _hash(rec)
+            if written is not None:
+                edited = written.get(rec["agent"]) != h
+            else:   # index from before hashes were kept: best effort against the log
+                current = self.get(rec["agent"])
+                edited = current is None or _hash(current) != h
+            if edited:
+                self.append(rec)
+                changed += 1
+        # Deletions are only knowable against the snapshot as written; agents
+        # appended since the last compaction were never in it and stay.
+        present = {rec["agent"] for rec in snapshot}
+        for agent in written or {}:
+            if agent not in present and agent in self:
+                self.append({"agent": agent, "deleted": True})
+                changed += 1
+        self.index["snapshot"] = stat
+        self.index["snapshot_hashes"] = {rec["agent"]: _hash(rec) for rec in snapshot}
+        self.save()
+        return changed
+
+    def save(self):
+        self._save_index()
+
+    def compact(self, force: bool = False) -> bool:
+        """Rewrite the pretty JSON snapshot from the latest versions, if stale."""
+        self.absorb_snapshot()
+        if not force and self.index["compacted_size"] == self.index["size"]:
+            return False
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        records = list(self.records())
+        with open(tmp, "w") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+        self.index["snapshot"] = self._snapshot_stat()
+        self.index["snapshot_hashes"] = {rec["agent"]: _hash(rec) for rec in records}
+        self.index["compacted_size"] = self.index["size"]
+        self.save()
+        return True
+
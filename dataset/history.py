@@ -0,0 +1,117 @@
+"""
+Response history
+Every instrument response the watcher has ever seen, content-addressed:
+
+  data/history/bodies.jsonl     {"hash", "content"}    each distinct body once
+  data/history/versions.jsonl   {"agent", "instrument", "comment_id",
+                                 "created_at", "source_post_id", "hash", "length"}
+
+Both files are append-only. A body is written the first time its sha256 is
+seen, so re-fetches, duplicate comments and agents quoting each other cost
+nothing; a version is written the first time an (instrument, agent,
+comment_id, hash) appears, so an edited comment or a second, richer submission becomes a new
+link in that agent's chain (one chain per instrument) instead of being dropped.
+
+preferred(instrument, agent) resolves the chain to the version the dataset
+should carry — the longest body, newest on ties (the rule fetch_responses
+always used) — without reading any bodies.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+REPO_DIR    = Path(__file__).resolve().parent.parent
+HISTORY_DIR = REPO_DIR / "data" / "history"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _read_lines(path: Path):
+    """(offset, length, record) per complete line; a torn final line is cut off."""
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        offset = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                f.truncate(offset)
+                return
+            yield offset, len(line), json.loads(line)
+            offset += len(line)
+
+
+class ResponseHistory:
+    def __init__(self, directory: Path = HISTORY_DIR):
+        self.dir = Path(directory)
+        self.bodies_path   = self.dir / "bodies.jsonl"
+        self.versions_path = self.dir / "versions.jsonl"
+        self._bodies: dict[str, tuple[int, int]] = {}
+        self._chains: dict[tuple[str, str], list[dict]] = {}
+        self._keys: set[tuple[str, str, str, str]] = set()
+        for offset, length, rec in _read_lines(self.bodies_path):
+            self._bodies[rec["hash"]] = (offset, length)
+        for _, _, v in _read_lines(self.versions_path):
+            self._link(v)
+
+    def _link(self, v: dict):
+        self._chains.setdefault((v["instrument"], v["agent"]), []).append(v)
+        self._keys.add((v["instrument"], v["agent"], v["comment_id"], v["hash"]))
+
+    def _append(self, path: Path, rec: dict) -> tuple[int, int]:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode()
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        return offset, len(line)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def knows(self, h: str) -> bool:
+        return h in self._bodies
+
+    def body(self, h: str) -> str:
+        offset, length = self._bodies[h]
+        with open(self.bodies_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))["content"]
+
+    def versions(self, instrument: str, agent: str) -> list[dict]:
+        return list(self._chains.get((instrument, agent), []))
+
+    def preferred(self, instrument: str, agent: str) -> dict | None:
+        chain = self._chains.get((instrument, agent))
+        if not chain:
+            return None
+        return max(chain, key=lambda v: (v["length"], v["created_at"]))
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def record(self, instrument: str, agent: str, comment_id: str, created_at: str,
+               content: str, source_post_id: str | None = None) -> bool:
+        """Add one observed response. Returns True if it's a new version."""
+        h = content_hash(content)
+        if (instrument, agent, comment_id, h) in self._keys:
+            return False
+        if h not in self._bodies:
+            self._bodies[h] = self._append(self.bodies_path, {"hash": h, "content": content})
+        v = {"agent": agent, "instrument": instrument, "comment_id": comment_id,
+             "created_at": created_at, "source_post_id": source_post_id,
+             "hash": h, "length": len(content)}
+        self._append(self.versions_path, v)
+        self._link(v)
+        return True
+
+    def seed(self, instrument: str, records):
+        """Start chains from existing dataset records (per-agent response files)."""
+        for rec in records:
+            if rec.get("content") is not None and (instrument, rec["agent"]) not in self._chains:
+                self.record(instrument, rec["agent"], rec.get("comment_id", ""),
+                            rec.get("created_at", ""), rec["content"], rec.get("source_post_id"))
@@ -0,0 +1,92 @@
+"""
+Multi-pattern keyword matcher
+KeywordMatcher compiles several named keyword families into one automaton
+and answers "which families occur in this text" in a single pass:
+
+    m = KeywordMatcher({"identity": [...], "request": [...]})
+    m.families("That lands — I am an Architect")   # frozenset({'identity'})
+
+Semantics are exactly the dashboard's original `any(kw in text.lower() ...)`
+per family (substring, case-insensitive), overlaps included.
+
+How: all keywords go into one trie, emitted as a prefix-factored regex, so
+re's compiled matcher walks the text once and each search lands on the next
+position where some keyword starts, taking the longest one there. Every
+keyword that is a prefix of that match also occurs at that position, so each
+keyword carries the union of its own and its prefixes' families (the
+Aho–Corasick output set) and restarting one character later keeps
+overlapping matches. The scan stops as soon as every family has matched.
+
+For long texts CPython's substring search (`in`) beats any regex walk (see
+bench/bench_keywords.py), so past LONG_TEXT characters the matcher falls back
+to one `in` per keyword with an early exit per family — same answers.
+"""
+from __future__ import annotations
+
+import re
+
+LONG_TEXT = 300   # chars; measured crossover between the regex walk and `in` loops
+
+
+def _trie_pattern(words) -> str:
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # Greedy optional tail: the longest keyword at a position wins
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    def __init__(self, families: dict[str, list[str]], long_text: int = LONG_TEXT):
+        self.names = list(families)
+        self.long_text = long_text
+        bit = {name: 1 << i for i, name in enumerate(self.names)}
+        self.all = (1 << len(self.names)) - 1
+
+        own: dict[str, int] = {}
+        for name, words in families.items():
+            for w in words:
+                own[w.lower()] = own.get(w.lower(), 0) | bit[name]
+        # Output set: a match also reports every keyword that is its prefix
+        self.masks = {w: 0 for w in own}
+        for w in own:
+            for v, m in own.items():
+                if w.startswith(v):
+                    self.masks[w] |= m
+        self.pattern = re.compile(_trie_pattern(own)) if own else None
+        self._by_family = [(bit[name], [w.lower() for w in words]) for name, words in families.items()]
+        self._sets = {m: frozenset(n for n in self.names if m & bit[n]) for m in range(self.all + 1)}
+
+    def mask(self, text: str) -> int:
+        """Bitmask of matched families (bit i = i-th family given)."""
+        text = (text or "").lower()
+        if self.pattern is None:
+            return 0
+        if len(text) > self.long_text:
+            return sum(b for b, words in self._by_family if any(w in text for w in words))
+        found, pos, search, masks = 0, 0, self.pattern.search, self.masks
+        while found != self.all:
+            m = search(text, pos)
+            if m is None:
+                break
+            found |= masks[m.group()]
+            pos = m.start() + 1
+        return found
+
+    def families(self, text: str) -> frozenset[str]:
+        return self._sets[self.mask(text)]
+
+    def families_batch(self, texts) -> list[frozenset[str]]:
+        sets, mask = self._sets, self.mask
+        return [sets[mask(t)] for t in texts]
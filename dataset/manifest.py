@@ -0,0 +1,116 @@
+"""
+Response manifest
+An index over data/responses/<instrument>/<agent>.json so the pollers don't
+open and parse every per-agent file each cycle:
+
+  {instrument: {agent: {"file", "mtime_ns", "size", "sha256", "record"}}}
+
+refresh() is one scandir per instrument folder: a file is re-parsed only when
+its mtime or size moved (hand edits, git pulls), new files are picked up and
+deleted ones dropped. save_response() writes the file and its entry together,
+so after a refresh "does this agent exist" is a dictionary lookup.
+
+The manifest (data/responses/.manifest.json) is derived and untracked —
+deleting it just costs one full parse on the next refresh.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+REPO_DIR      = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_DIR / "data" / "responses"
+INSTRUMENTS   = ("instrument_1", "instrument_2")
+
+
+class ResponseIndex:
+    def __init__(self, data_dir: Path = RESPONSES_DIR, instruments=INSTRUMENTS):
+        self.data_dir = Path(data_dir)
+        self.instruments = tuple(instruments)
+        self.path = self.data_dir / ".manifest.json"
+        self.entries: dict[str, dict[str, dict]] = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def refresh(self) -> "ResponseIndex":
+        """Bring the manifest in line with the folders; parse only changed files."""
+        for instrument in self.instruments:
+            folder = self.data_dir / instrument
+            known = self.entries.setdefault(instrument, {})
+            by_file = {e["file"]: agent for agent, e in known.items()}
+            present = set()
+            if folder.is_dir():
+                with os.scandir(folder) as it:
+                    for de in it:
+                        if not de.name.endswith(".json") or not de.is_file():
+                            continue
+                        present.add(de.name)
+                        st = de.stat()
+                        agent = by_file.get(de.name)
+                        e = known.get(agent) if agent else None
+                        if e and e["mtime_ns"] == st.st_mtime_ns and e["size"] == st.st_size:
+                            continue
+                        if agent:
+                            del known[agent]
+                        self._index(instrument, Path(de.path))
+            for name, agent in by_file.items():
+                if name not in present:
+                    known.pop(agent, None)
+                    self._dirty = True
+        self.save()
+        return self
+
+    def _index(self, instrument: str, fpath: Path):
+        raw = fpath.read_bytes()
+        record = json.loads(raw)
+        st = fpath.stat()
+        self.entries.setdefault(instrument, {})[record["agent"]] = {
+            "file":     fpath.name,
+            "mtime_ns": st.st_mtime_ns,
+            "size":     st.st_size,
+            "sha256":   hashlib.sha256(raw).hexdigest(),
+            "record":   record,
+        }
+        self._dirty = True
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def has(self, instrument: str, agent: str) -> bool:
+        return agent in self.entries.get(instrument, {})
+
+    def records(self, instrument: str) -> dict[str, dict]:
+        """{agent: record} for one instrument, in file-name order."""
+        entries = self.entries.get(instrument, {})
+        return {a: entries[a]["record"] for a in sorted(entries, key=lambda a: entries[a]["file"])}
+
+    def all_records(self):
+        for instrument in self.instruments:
+            yield from self.records(instrument).values()
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def save_response(self, instrument: str, resp: dict) -> Path:
+        folder = self.data_dir / instrument
+        folder.mkdir(parents=True, exist_ok=True)
+        fpath = folder / f"{resp['agent']}.json"
+        with open(fpath, "w") as f:
+            json.dump(resp, f, indent=2, ensure_ascii=False)
+        self._index(instrument, fpath)
+        return fpath
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
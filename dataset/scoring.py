@@ -0,0 +1,205 @@
+"""
+Instrument 1 scoring
+Turns Q-keyed answer sheets ("Q1:C Q2:A … Q10:C") into archetype score
+vectors, instead of reading the archetype off the hand-filled field:
+
+  answer_matrix(texts)   parse every sheet (dataset.answers) into an int8
+                         matrix, respondents × QUESTIONS, option index 0–4
+                         (A–E), -1 where a question is unanswered
+  score(matrix, w)       one-hot the matrix to respondents × (Q·5) and apply
+                         the answer → archetype weight tensor w (Q, 5,
+                         archetypes) as a single matrix multiply
+  labels(scores)         primary / secondary archetype per row
+
+score_dataset() runs all three over the combined log's instrument_1 records.
+The whole dataset is one vectorized call; nothing loops per record after
+parsing.
+
+For the KPI dashboard's Divergence Score, declared_archetype() reads a
+self-declaration out of a thread comment ("I am closer to Philosopher",
+"Architect — that's me"), measured_archetypes() takes each respondent's
+instrument archetype (the researcher's hand label, or — when a scoring key
+is supplied — the scored primary for a Q sheet that has none), and divergence()
+compares the two as int8 code arrays.
+
+The scoring key (for every question, which archetype(s) each option signals
+and how strongly) belongs to the instrument, which is published on Moltbook
+rather than kept here, so it is not hard-coded either: the researcher
+supplies it as data/processed/instrument_1_key.json,
+
+  {"<question 1–10>": {"<option a–e>": {"<archetype>": <weight>, …}, …}, …}
+
+and the weight tensor is built from that file. Without it score_dataset()
+refuses to run and measured_archetypes() uses hand labels only.
+bench/bench_scoring.py exercises the engine with a synthetic key.
+
+  python3 -m dataset.scoring          # scored vs. hand-labelled archetype per agent
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from dataset.answers import parse_batch
+from dataset.combined import PROCESSED, CombinedLog
+
+ARCHETYPES = ("Substrate", "Architect", "Philosopher", "Agent", "Resident")
+OPTIONS    = "abcde"
+QUESTIONS  = 10
+KEY_PATH   = PROCESSED / "instrument_1_key.json"   # researcher-supplied, see above
+
+# Lowercase "agent" is how every respondent describes itself, so only the
+# capitalised archetype counts; the other names match in any case.
+_NAMES   = r"(?i:substrate|architect|philosopher|resident)|Agent"
+DECLARED = re.compile(
+    r"\b(?i:i\s+am|i['’]?m|i\s+identify\s+as|my\s+type\s+is|closer\s+to)\s+"
+    r"(?:(?i:more|mostly|probably|definitely|clearly|really|actually|closer\s+to|an?|the|of|like)\s+)*"
+    rf"({_NAMES})\b"
+    rf"|\b({_NAMES})\s*[—–\-:,.]?\s*(?i:that['’]?s\s+me|is\s+me)\b"
+)
+
+def load_key(path: Path = KEY_PATH) -> dict[int, dict[str, dict[str, float]]]:
+    """The scoring key, question → option → {archetype: weight}."""
+    if not Path(path).exists():
+        raise FileNotFoundError(f"No scoring key at {path} — supply the instrument's key "
+                                "(question → option → {archetype: weight}) before scoring")
+    with open(path) as f:
+        raw = json.load(f)
+    key = {int(q): options for q, options in raw.items()}
+    for q, options in key.items():
+        if not 1 <= q <= QUESTIONS:
+            raise ValueError(f"{path}: question {q} is outside 1–{QUESTIONS}")
+        for letter, weights in options.items():
+            if letter not in OPTIONS:
+                raise ValueError(f"{path}: Q{q} has unknown option {letter!r}")
+            unknown = set(weights) - set(ARCHETYPES)
+            if unknown:
+                raise ValueError(f"{path}: Q{q}{letter} names unknown archetype(s) {sorted(unknown)}")
+    return key
+
+
+def weight_tensor(loadings: dict) -> np.ndarray:
+    """(QUESTIONS, len(OPTIONS), len(ARCHETYPES)) float32 from a scoring key."""
+    w = np.zeros((QUESTIONS, len(OPTIONS), len(ARCHETYPES)), dtype=np.float32)
+    col = {a: i for i, a in enumerate(ARCHETYPES)}
+    for q, options in loadings.items():
+        for letter, weights in options.items():
+            for archetype, value in weights.items():
+                w[q - 1, OPTIONS.index(letter), col[archetype]] = value
+    return w
+
+
+def answer_matrix(texts) -> tuple[np.ndarray, np.ndarray]:
+    """(int8 matrix respondents × QUESTIONS, bool mask of texts that were Q sheets)."""
+    parsed = parse_batch(texts)
+    is_sheet = np.array([p is not None and p["format"] == "Q" for p in parsed], dtype=bool)
+    m = np.full((int(is_sheet.sum()), QUESTIONS), -1, dtype=np.int8)
+    rows = [p["answers"] for p, ok in zip(parsed, is_sheet) if ok]
+    for i, answers in enumerate(rows):
+        for q, letter in answers.items():
+            if 1 <= q <= QUESTIONS:
+                m[i, q - 1] = OPTIONS.index(letter)
+    return m, is_sheet
+
+
+def score(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Archetype scores, respondents × len(ARCHETYPES). Unanswered questions add nothing."""
+    q, k, a = weights.shape
+    onehot = (matrix[:, :, None] == np.arange(k, dtype=np.int8)).reshape(len(matrix), q * k)
+    return onehot.astype(np.float32) @ weights.reshape(q * k, a)
+
+
+def labels(scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(primary, secondary) archetype per row; None where the score is zero.
+    Ties go to the archetype listed first in ARCHETYPES."""
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :2]
+    top = np.take_along_axis(scores, order, axis=1)
+    names = np.array(ARCHETYPES, dtype=object)[order]
+    names[top <= 0] = None
+    return names[:, 0], names[:, 1]
+
+
+def score_dataset(log: CombinedLog | None = None, key_path: Path = KEY_PATH) -> dict[str, dict]:
+    """{agent: {"scores": {archetype: score}, "answers": "CACDCCDCBC", "archetype", "archetype_secondary"}}
+    for every instrument_1 record whose content is a Q sheet. Raises
+    FileNotFoundError when there is no scoring key at `key_path`."""
+    weights = weight_tensor(load_key(key_path))
+    records = [r for r in (log or CombinedLog()).records() if r.get("instrument") == "instrument_1"]
+    matrix, is_sheet = answer_matrix([r.get("content", "") for r in records])
+    scores = score(matrix, weights)
+    primary, secondary = labels(scores)
+    agents = [r["agent"] for r, ok in zip(records, is_sheet) if ok]
+    return {
+        agent: {
+            "scores": dict(zip(ARCHETYPES, row.tolist())),
+            "answers": "".join(OPTIONS[c].upper() if c >= 0 else "-" for c in answers),
+            "archetype": p,
+            "archetype_secondary": s,
+        }
+        for agent, row, answers, p, s in zip(agents, scores, matrix, primary, secondary)
+    }
+
+
+def canonical(label: str | None) -> str | None:
+    """The archetype a free-form label starts with ("Architect (shadow-aware)" → Architect)."""
+    m = re.match(r"\s*(\w+)", label or "")
+    name = m.group(1).capitalize() if m else None
+    return name if name in ARCHETYPES else None
+
+
+def declared_archetype(text: str) -> str | None:
+    """The archetype a comment claims for its author, if it makes such a claim."""
+    m = DECLARED.search(text or "")
+    return (m.group(1) or m.group(2)).capitalize() if m else None
+
+
+def measured_archetypes(records: dict[str, dict], key_path: Path = KEY_PATH) -> dict[str, str]:
+    """{agent: archetype} from instrument records — the hand label where the
+    researcher filled one in, else (when a scoring key is supplied) the scored
+    primary of a Q sheet, one vectorized call for all of them."""
+    agents = list(records)
+    measured = [canonical(r.get("archetype")) for r in records.values()]
+    if not Path(key_path).exists():
+        return {a: m for a, m in zip(agents, measured) if m}
+    matrix, is_sheet = answer_matrix([r.get("content", "") for r in records.values()])
+    primary, _ = labels(score(matrix, weight_tensor(load_key(key_path))))
+    for i, p in zip(np.flatnonzero(is_sheet), primary):
+        measured[i] = measured[i] or p
+    return {a: m for a, m in zip(agents, measured) if m}
+
+
+def divergence(declared: dict[str, str], measured: dict[str, str]) -> dict:
+    """Declared-vs-measured mismatch over agents present in both:
+    {"n", "mismatches", "rate", "by_archetype": {measured archetype: (mismatches, n)}}."""
+    agents = sorted(declared.keys() & measured.keys())
+    code = {a: i for i, a in enumerate(ARCHETYPES)}
+    d = np.fromiter((code[declared[a]] for a in agents), dtype=np.int8, count=len(agents))
+    m = np.fromiter((code[measured[a]] for a in agents), dtype=np.int8, count=len(agents))
+    miss = d != m
+    n_by = np.bincount(m, minlength=len(ARCHETYPES))
+    miss_by = np.bincount(m, weights=miss, minlength=len(ARCHETYPES)).astype(int)
+    return {
+        "n": len(agents),
+        "mismatches": int(miss.sum()),
+        "rate": float(miss.mean()) if len(agents) else None,
+        "by_archetype": {a: (int(x), int(n)) for a, x, n in zip(ARCHETYPES, miss_by, n_by) if n},
+    }
+
+
+if __name__ == "__main__":
+    declared = {r["agent"]: r for r in CombinedLog().records()}
+    try:
+        scored = score_dataset()
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+    print(f"{len(scored)} scored answer sheet(s)\n")
+    print(f"{'AGENT':<16} {'ANSWERS':<11}" + "".join(f"{a[:5]:>7}" for a in ARCHETYPES) + "   SCORED / LABELLED")
+    for agent, s in scored.items():
+        rec = declared.get(agent, {})
+        print(f"{agent:<16} {s['answers']:<11}" + "".join(f"{v:>7.0f}" for v in s["scores"].values())
+              + f"   {s['archetype']} / {s['archetype_secondary']}"
+              + f"  vs  {rec.get('archetype')} / {rec.get('archetype_secondary')}")
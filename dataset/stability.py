@@ -0,0 +1,132 @@
+"""
+Archetype distribution stability
+A streaming estimator behind the dashboard's Distribution Stability KPI.
+game_classifier.py feeds it every archetype it classifies; it keeps
+
+  counts    running archetype counts over everything observed
+  recent    the last 2·WINDOW archetype codes (int8), oldest first
+  current   Jensen–Shannon divergence (base 2, 0 = identical, 1 = disjoint)
+            between the previous and the latest window, with a bootstrap
+            95% confidence interval
+
+in data/index/stability.json (untracked, a few hundred bytes). All the work
+happens in observe(); the dashboard only reads `current`, so its cost does
+not grow with the dataset.
+
+The bootstrap resamples both windows BOOTSTRAP times in one go: the
+(BOOTSTRAP, w) index matrices are drawn at once and the per-resample counts
+come from a single bincount with a row offset, so there is no Python loop
+over resamples.
+
+  python3 -m dataset.stability        # print the current estimate
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from dataset.scoring import ARCHETYPES, canonical
+
+REPO_DIR       = Path(__file__).resolve().parent.parent
+STABILITY_PATH = REPO_DIR / "data" / "index" / "stability.json"
+WINDOW         = 50      # observations per window, once there are enough
+MIN_WINDOW     = 5       # below 2·MIN_WINDOW observations there is no estimate
+BOOTSTRAP      = 1000
+
+
+def jsd(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Jensen–Shannon divergence (bits) between count vectors along the last axis."""
+    p = p / p.sum(axis=-1, keepdims=True)
+    q = q / q.sum(axis=-1, keepdims=True)
+    m = (p + q) / 2
+
+    def kl(a, b):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(a > 0, a * np.log2(a / b), 0.0).sum(axis=-1)
+
+    return (kl(p, m) + kl(q, m)) / 2
+
+
+def _counts(codes: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise bincount of a (rows, n) code matrix → (rows, k)."""
+    rows = codes.shape[0]
+    flat = (codes + np.arange(rows)[:, None] * k).ravel()
+    return np.bincount(flat, minlength=rows * k).reshape(rows, k)
+
+
+class StabilityTracker:
+    def __init__(self, path: Path = STABILITY_PATH):
+        self.path = Path(path)
+        self.state = {"n": 0, "counts": [0] * len(ARCHETYPES), "recent": [], "current": None}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.state.update(json.load(f))
+
+    @property
+    def n(self) -> int:
+        return self.state["n"]
+
+    @property
+    def current(self) -> dict | None:
+        """{"jsd", "ci": [lo, hi], "window", "n"} as of the last observe(), or None."""
+        return self.state["current"]
+
+    def counts(self) -> dict[str, int]:
+        return dict(zip(ARCHETYPES, self.state["counts"]))
+
+    def seed(self, labels):
+        """Start from history (e.g. every classification so far, oldest first)."""
+        self.observe(labels)
+        self._save()
+
+    def observe(self, labels, seed: int | None = None) -> dict | None:
+        """Fold newly classified archetype labels in (unknown labels are ignored)
+        and refresh the estimate. Returns the new `current`."""
+        codes = [ARCHETYPES.index(a) for a in map(canonical, labels) if a]
+        if not codes:
+            return self.current
+        counts = self.state["counts"]
+        for c in codes:
+            counts[c] += 1
+        self.state["n"] += len(codes)
+        self.state["recent"] = (self.state["recent"] + codes)[-2 * WINDOW:]
+        self.state["current"] = self._estimate(np.array(self.state["recent"], dtype=np.int8), seed)
+        self._save()
+        return self.current
+
+    def _estimate(self, recent: np.ndarray, seed: int | None) -> dict | None:
+        w = min(WINDOW, len(recent) // 2)
+        if w < MIN_WINDOW:
+            return None
+        k = len(ARCHETYPES)
+        before, after = recent[-2 * w:-w], recent[-w:]
+        stat = float(jsd(np.bincount(before, minlength=k), np.bincount(after, minlength=k)))
+
+        rng = np.random.default_rng(seed)
+        boot = jsd(_counts(before[rng.integers(0, w, (BOOTSTRAP, w))], k),
+                   _counts(after[rng.integers(0, w, (BOOTSTRAP, w))], k))
+        lo, hi = np.percentile(boot, [2.5, 97.5])
+        return {"jsd": round(stat, 4), "ci": [round(float(lo), 4), round(float(hi), 4)],
+                "window": w, "n": self.state["n"]}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+if __name__ == "__main__":
+    t = StabilityTracker()
+    cur = t.current
+    print(f"{t.n} archetype observation(s): "
+          + " · ".join(f"{a} {c}" for a, c in t.counts().items() if c))
+    if cur:
+        print(f"JSD {cur['jsd']:.3f}  95% CI [{cur['ci'][0]:.3f}, {cur['ci'][1]:.3f}]  "
+              f"(last {cur['window']} vs. previous {cur['window']})")
+    else:
+        print(f"No estimate until {2 * MIN_WINDOW} observations")
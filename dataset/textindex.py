@@ -0,0 +1,187 @@
+"""
+Full-text index over archived comments and instrument responses
+An inverted index kept in SQLite (data/index/text.sqlite3, untracked):
+
+  docs       doc_id → kind, post, author, created_at, content hash, text
+  postings   (term, doc_id) → token positions, primary-key ordered by term
+
+Documents are added incrementally — a comment whose text hash hasn't changed
+is skipped, an edited one has its postings replaced — so re-indexing the same
+threads every run costs a lookup per comment. The KPI dashboard archives every
+thread it fetches here, and the instrument responses are indexed alongside.
+
+Queries are AND over terms; "quoted phrases" must appear as consecutive
+tokens. Tokens are lowercased words that may carry inner . - ' (so
+HEARTBEAT.md and that's stay single terms).
+
+  python3 -m dataset.textindex search 'HEARTBEAT.md'
+  python3 -m dataset.textindex search '"that lands" archetype'
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import shlex
+import sqlite3
+import sys
+from array import array
+from pathlib import Path
+
+REPO_DIR   = Path(__file__).resolve().parent.parent
+INDEX_PATH = REPO_DIR / "data" / "index" / "text.sqlite3"
+TOKEN      = re.compile(r"\w(?:[\w.'’\-]*\w)?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id     TEXT PRIMARY KEY,
+    kind       TEXT,                 -- 'comment' | 'response'
+    post_id    TEXT,
+    author     TEXT,
+    created_at TEXT,
+    hash       TEXT,
+    text       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS postings (
+    term      TEXT NOT NULL,
+    doc_id    TEXT NOT NULL,
+    positions BLOB NOT NULL,         -- array('I') of token offsets
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    return [m.group(0).lower() for m in TOKEN.finditer(text or "")]
+
+
+def parse_query(query: str) -> list[list[str]]:
+    """Each element is one required term or phrase, as its token list."""
+    return [toks for part in shlex.split(query) if (toks := tokenize(part))]
+
+
+class TextIndex:
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    # ── Indexing ─────────────────────────────────────────────────────────────
+
+    def add_many(self, docs) -> int:
+        """Index (doc_id, text, meta) triples in one transaction; returns how many changed."""
+        changed = 0
+        with self.conn:
+            for doc_id, text, meta in docs:
+                h = hashlib.sha1((text or "").encode()).hexdigest()
+                row = self.conn.execute("SELECT hash FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+                if row and row[0] == h:
+                    continue
+                if row:
+                    self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                positions: dict[str, array] = {}
+                for i, term in enumerate(tokenize(text)):
+                    positions.setdefault(term, array("I")).append(i)
+                self.conn.executemany(
+                    "INSERT INTO postings (term, doc_id, positions) VALUES (?, ?, ?)",
+                    [(term, doc_id, pos.tobytes()) for term, pos in positions.items()])
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO docs (doc_id, kind, post_id, author, created_at, hash, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_id, meta.get("kind"), meta.get("post_id"), meta.get("author"),
+                     meta.get("created_at"), h, text))
+                changed += 1
+        return changed
+
+    def add_comments(self, post_id: str, comments: list[dict]) -> int:
+        return self.add_many(
+            (c["id"], c.get("content", ""),
+             {"kind": "comment", "post_id": post_id, "author": c.get("author", {}).get("name"),
+              "created_at": c.get("created_at")})
+            for c in comments)
+
+    def add_responses(self, records) -> int:
+        """Instrument / dataset records, keyed response:<agent>."""
+        return self.add_many(
+            (f"response:{r['agent']}", r.get("content", ""),
+             {"kind": "response", "post_id": r.get("source_post_id"), "author": r["agent"],
+              "created_at": r.get("created_at")})
+            for r in records)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def postings(self, term: str) -> dict[str, array]:
+        out = {}
+        for doc_id, blob in self.conn.execute(
+                "SELECT doc_id, positions FROM postings WHERE term = ?", (term.lower(),)):
+            pos = array("I")
+            pos.frombytes(blob)
+            out[doc_id] = pos
+        return out
+
+    def _phrase(self, tokens: list[str]) -> set[str]:
+        lists = [self.postings(t) for t in tokens]
+        docs = set(lists[0]).intersection(*lists[1:]) if lists else set()
+        if len(tokens) == 1:
+            return docs
+        hits = set()
+        for doc in docs:
+            rest = [set(pl[doc]) for pl in lists[1:]]
+            if any(all(p + i + 1 in s for i, s in enumerate(rest)) for p in lists[0][doc]):
+                hits.add(doc)
+        return hits
+
+    def search(self, query: str) -> list[str]:
+        """doc_ids matching every term/phrase in `query`, oldest first."""
+        parts = parse_query(query)
+        if not parts:
+            return []
+        docs = None
+        # Rarest part first keeps the intersections small
+        for tokens in sorted(parts, key=lambda t: self.doc_freq(t[0])):
+            hits = self._phrase(tokens)
+            docs = hits if docs is None else docs & hits
+            if not docs:
+                return []
+        return sorted(docs, key=lambda d: self.doc(d)["created_at"] or "")
+
+    def doc_freq(self, term: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM postings WHERE term = ?", (term.lower(),)).fetchone()[0]
+
+    def doc(self, doc_id: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT doc_id, kind, post_id, author, created_at, text FROM docs WHERE doc_id = ?",
+            (doc_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("doc_id", "kind", "post_id", "author", "created_at", "text"), row))
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+def _snippet(text: str, tokens: list[str], width: int = 80) -> str:
+    low = text.lower()
+    at = min((i for i in (low.find(t) for t in tokens) if i >= 0), default=0)
+    start = max(0, at - width // 3)
+    return ("…" if start else "") + text[start:start + width].replace("\n", " ")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "search":
+        ix = TextIndex()
+        terms = [t for part in parse_query(sys.argv[2]) for t in part]
+        hits = ix.search(sys.argv[2])
+        print(f"{len(hits)} match(es) in {len(ix)} indexed docs")
+        for doc_id in hits:
+            d = ix.doc(doc_id)
+            print(f"  [{d['kind']}] @{d['author']} {(d['created_at'] or '')[:10]} {doc_id[:18]}")
+            print(f"    {_snippet(d['text'], terms)}")
+    else:
+        print("Usage: python3 -m dataset.textindex search '<terms or \"phrase\">'")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+MABP Service
+Runs every polling job in one process instead of five launchd daemons:
+
+  game_classifier        every 10 min   priority 0  (queues replies)
+  replies                every 30 s     priority 0  (posts queued replies)
+  notification_watcher   every 10 min   priority 1  (+ pinned posts)
+  check_and_reply        every 10 min   priority 2
+  sync_responses         every 15 min   priority 3
+  poster                 every 24 h     priority 4
+  publish                every 1 min    priority 5  (commits/pushes queued dataset updates)
+
+Jobs run as tasks on one asyncio event loop. Each tick, every job that is due
+runs in priority order inside moltbook.shared_reads(), so jobs that land in
+the same tick read one snapshot of each thread instead of refetching it.
+
+Usage:
+  python3 mabp_service.py --once    # run every job once, then exit
+  python3 mabp_service.py           # service (launchd: com.thefranceway.mabp)
+"""
+import asyncio, heapq, sys, time, logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+REPO_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(REPO_DIR / "campaign"))
+
+import check_and_reply, game_classifier, notification_watcher, poster, reply_sender
+import sync_responses
+from moltbook import shared_reads
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%H:%M:%S")
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    priority: int
+    run: Callable[[], object]
+
+
+def check_notifications():
+    notification_watcher.check_once()
+    notification_watcher.check_pinned_posts()
+
+
+JOBS = [
+    Job("game_classifier", game_classifier.POLL,           0, game_classifier.check_once),
+    Job("replies",         reply_sender.POLL_SECS,         0, reply_sender.drain_once),
+    Job("notifications",   notification_watcher.POLL_SECS, 1, check_notifications),
+    Job("check_and_reply", check_and_reply.POLL_SECS,      2, check_and_reply.check_once),
+    Job("sync_responses",  sync_responses.POLL_SECS,       3, sync_responses.check_once),
+    Job("poster",          poster.POLL_SECS,               4, poster.post_if_due),
+    Job("publish",         60,                             5, sync_responses.publisher.flush),
+]
+
+
+def run_job(job: Job):
+    started = time.monotonic()
+    try:
+        job.run()
+    except Exception as e:
+        log.error(f"[{job.name}] Error: {e}")
+    log.info(f"[{job.name}] done in {time.monotonic() - started:.1f}s")
+
+
+async def run_tick(due: list[Job]):
+    """Run the due jobs in priority order, sharing reads across the whole tick."""
+    with shared_reads():
+        for job in sorted(due, key=lambda j: j.priority):
+            await asyncio.to_thread(run_job, job)
+
+
+async def serve(jobs: list[Job]):
+    # (next run, priority, index) — every job is due immediately on start
+    now = time.monotonic()
+    queue = [(now, job.priority, i) for i, job in enumerate(jobs)]
+    heapq.heapify(queue)
+    log.info(f"Service started — {len(jobs)} jobs: {', '.join(j.name for j in jobs)}")
+
+    while True:
+        now = time.monotonic()
+        if queue[0][0] > now:
+            await asyncio.sleep(queue[0][0] - now)
+            continue
+
+        due = []
+        while queue and queue[0][0] <= now:
+            due.append(heapq.heappop(queue))
+        await run_tick([jobs[i] for _, _, i in due])
+
+        # Keep each job's cadence; if a tick overran, don't fire a backlog of catch-up runs
+        finished = time.monotonic()
+        for at, prio, i in due:
+            heapq.heappush(queue, (max(at + jobs[i].interval, finished), prio, i))
+
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:
+        asyncio.run(run_tick(JOBS))
+    else:
+        asyncio.run(serve(JOBS))
@@ -0,0 +1,32 @@
+"""Shared Moltbook API layer for the MABP scripts."""
+from moltbook.client import (
+    BASE_URL,
+    CALLS,
+    api_calls,
+    create_post,
+    get_comments,
+    get_notifications,
+    get_post,
+    get_posts,
+    iter_comments,
+    iter_posts,
+    post_comment,
+    session,
+    shared_reads,
+)
+
+__all__ = [
+    "BASE_URL",
+    "CALLS",
+    "api_calls",
+    "create_post",
+    "get_comments",
+    "get_notifications",
+    "get_post",
+    "get_posts",
+    "iter_comments",
+    "iter_posts",
+    "post_comment",
+    "session",
+    "shared_reads",
+]
@@ -0,0 +1,109 @@
+"""
+Persistent HTTP response cache
+On-disk cache of GET responses shared by every process on the host, so the
+daemons stop refetching the same /posts listing and post titles each cycle.
+Entries are served locally while younger than the endpoint's TTL. Once stale,
+the client revalidates with If-None-Match / If-Modified-Since when the server
+sent an ETag or Last-Modified, and reuses the cached body on a 304.
+
+One JSON file per URL + query, written via temp file + rename so concurrent
+daemons never read a half-written entry. Files are grouped in a directory per
+URL without its query, so every page of a listing can be dropped at once
+(delete_url) after a write changes it.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHE_DIR = Path(os.environ.get("MOLTBOOK_CACHE_DIR",
+                                Path.home() / ".cache" / "mabp" / "http"))
+
+# Lookups answered without a full fetch: "fresh" (within TTL), "revalidated"
+# (304) or "shared" (same tick of the mabp service, see client.shared_reads).
+HITS: Counter[str] = Counter()
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+
+def key_url(key: str) -> str:
+    """The URL a cache key was built from, without its query."""
+    return key.split("?", 1)[0]
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.dir = Path(cache_dir)
+
+    def _dir(self, url: str) -> Path:
+        return self.dir / hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self._dir(key_url(key)) / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, body, headers) -> dict:
+        entry = {
+            "key":           key,
+            "body":          body,
+            "etag":          headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at":    time.time(),
+        }
+        self._write(key, entry)
+        return entry
+
+    def touch(self, key: str, entry: dict):
+        """Mark a revalidated (304) entry as fresh again."""
+        entry["fetched_at"] = time.time()
+        self._write(key, entry)
+
+    def delete(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+    def delete_url(self, url: str):
+        """Drop every cached query of `url` (all pages of a listing)."""
+        try:
+            entries = list(self._dir(url).glob("*.json"))
+        except OSError:
+            return
+        for path in entries:
+            path.unlink(missing_ok=True)
+
+    def _write(self, key: str, entry: dict):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def is_fresh(entry: dict, ttl: float) -> bool:
+    return ttl > 0 and time.time() - entry["fetched_at"] < ttl
+
+
+def validators(entry: dict | None) -> dict:
+    """Conditional-request headers for a stale entry (empty if the server sent none)."""
+    if not entry:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
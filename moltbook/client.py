@@ -0,0 +1,256 @@
+"""
+Moltbook API client
+One keep-alive requests.Session per process, shared by sync_responses.py and
+everything in campaign/ and dashboard/. Every call reuses a pooled TCP+TLS
+connection instead of paying a fresh handshake per request, and draws a
+token from the cross-process rate limiter (moltbook/ratelimit.py) first.
+GETs go through the on-disk response cache (moltbook/cache.py).
+
+Usage:
+    from moltbook import get_posts, get_comments, post_comment
+
+    for post in get_posts("thefranceway"):
+        comments = get_comments(post["id"])
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from moltbook import cache
+
+log = logging.getLogger(__name__)
+from moltbook.ratelimit import RateLimiter
+
+# Override to point every script at a local stand-in (python3 -m moltbook.fake_server).
+BASE_URL = os.environ.get("MOLTBOOK_BASE_URL", "https://www.moltbook.com/api/v1")
+POOL_SIZE = 16  # max pooled connections per host
+
+# Seconds per endpoint. Writes get longer because the API is slower to ack them.
+TIMEOUTS = {
+    "posts":         10,
+    "post":          10,
+    "comments":      10,
+    "notifications": 10,
+    "create_post":   15,
+    "post_comment":  15,
+}
+
+# Seconds a cached GET is served without asking the server (moltbook/cache.py).
+# 0 = always revalidate, which costs a 304 when nothing changed.
+CACHE_TTLS = {
+    "posts":         120,
+    "post":          3600,   # titles don't change
+    "comments":      0,
+    "notifications": 0,
+}
+
+# Requests made by this process, per endpoint (read by the KPI dashboard).
+CALLS: Counter[str] = Counter()
+
+_session: requests.Session | None = None
+_limiter: RateLimiter | None = None
+_cache = cache.ResponseCache()
+_shared: dict | None = None   # GET results shared for the duration of a shared_reads() block
+_lock = threading.Lock()  # the session and CALLS are shared by moltbook.fetch worker threads
+
+
+def session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session, _limiter
+    with _lock:
+        if _session is None:
+            api_key = os.environ["MOLTBOOK_API_KEY"]
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers["Authorization"] = f"Bearer {api_key}"
+            _limiter = RateLimiter(api_key)
+            _session = s
+    return _session
+
+
+def api_calls() -> int:
+    """Total API requests made by this process so far."""
+    return sum(CALLS.values())
+
+
+def _count(endpoint: str):
+    with _lock:
+        CALLS[endpoint] += 1
+
+
+def _hit(kind: str):
+    with _lock:
+        cache.HITS[kind] += 1
+
+
+@contextmanager
+def shared_reads():
+    """Answer identical GETs once for the duration of the block.
+
+    The mabp service wraps each scheduler tick in this, so jobs due in the
+    same tick read one snapshot of each thread instead of refetching it.
+    """
+    global _shared
+    _shared = {}
+    try:
+        yield
+    finally:
+        _shared = None
+
+
+def _get(path: str, endpoint: str, **params) -> dict | list:
+    url = f"{BASE_URL}{path}"
+    key = cache.cache_key(url, params)
+    shared = _shared
+    if shared is not None and key in shared:
+        _hit("shared")
+        return shared[key]
+    body = _fetch(url, key, endpoint, params)
+    if shared is not None:
+        shared[key] = body
+    return body
+
+
+def _fetch(url: str, key: str, endpoint: str, params: dict) -> dict | list:
+    entry = _cache.get(key)
+    if entry and cache.is_fresh(entry, CACHE_TTLS[endpoint]):
+        _hit("fresh")
+        return entry["body"]
+
+    s = session()
+    _limiter.acquire("read")
+    _count(endpoint)
+    r = s.get(url, params=params or None, headers=cache.validators(entry),
+              timeout=TIMEOUTS[endpoint])
+    if r.status_code == 304 and entry:
+        _hit("revalidated")
+        _cache.touch(key, entry)
+        return entry["body"]
+    # An error body must not read as an empty thread — that would advance watermarks
+    r.raise_for_status()
+    body = r.json()
+    _cache.put(key, body, r.headers)
+    return body
+
+
+def _post(path: str, endpoint: str, payload: dict, headers: dict | None = None) -> requests.Response:
+    s = session()
+    _limiter.acquire("write")
+    _count(endpoint)
+    return s.post(f"{BASE_URL}{path}", json=payload, headers=headers, timeout=TIMEOUTS[endpoint])
+
+
+# ── Reads ─────────────────────────────────────────────────────────────────────
+# Listings are paged. The iterators follow the API's next_cursor lazily (or
+# fall back to offset paging while pages come back full), so callers can stop
+# early and never hold more than one page they haven't consumed. Comments are
+# first requested without a limit, as they always were: a server that caps the
+# page but offers no cursor to continue from would otherwise cut the thread at
+# `limit` without anyone noticing.
+
+POSTS_PAGE    = 50
+COMMENTS_PAGE = 100
+
+
+def _pages(path: str, endpoint: str, key: str, page_size: int, limit_after_cursor: bool = False,
+           **params) -> Iterator[list[dict]]:
+    """Pages of `key` items. With `limit_after_cursor`, `limit` is only sent
+    once the API has returned a cursor, and there is no offset fallback."""
+    cursor, offset, firsts = None, 0, set()
+    paged = not limit_after_cursor
+    while True:
+        query = dict(params, limit=page_size) if paged else dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        elif offset:
+            query["offset"] = offset
+        data = _get(path, endpoint, **query)
+        items = data if isinstance(data, list) else data.get(key, [])
+        if not items:
+            return
+        if items[0].get("id") in firsts:
+            log.warning(f"{path}: the page at {f'cursor {cursor}' if cursor else f'offset {offset}'} "
+                        "repeats an earlier one (paging ignored) — the listing may be truncated")
+            return
+        firsts.add(items[0].get("id"))
+        yield items
+
+        meta = data if isinstance(data, dict) else {}
+        cursor = meta.get("next_cursor") or meta.get("nextCursor")
+        if cursor:
+            paged = True
+            continue
+        if not paged or len(items) < page_size or meta.get("has_more") is False:
+            return
+        offset += len(items)
+
+
+def iter_posts(author: str, until: str | None = None, page_size: int = POSTS_PAGE) -> Iterator[dict]:
+    """Every post by `author`, newest first. Stops at the first post created
+    before `until` (ISO timestamp) without fetching further pages."""
+    for page in _pages("/posts", "posts", "posts", page_size, author=author):
+        for post in page:
+            created = post.get("created_at")
+            if until and created and created < until:
+                return
+            yield post
+
+
+def iter_comments(post_id: str, page_size: int = COMMENTS_PAGE) -> Iterator[dict]:
+    """Every comment on a post. The API returns either a bare list or {"comments": [...]}."""
+    for page in _pages(f"/posts/{post_id}/comments", "comments", "comments", page_size,
+                       limit_after_cursor=True):
+        yield from page
+
+
+def get_posts(author: str, limit: int | None = None) -> list[dict]:
+    return list(islice(iter_posts(author), limit))
+
+
+def get_post(post_id: str) -> dict:
+    data = _get(f"/posts/{post_id}", "post")
+    return data.get("post", data)
+
+
+def get_comments(post_id: str) -> list[dict]:
+    return list(iter_comments(post_id))
+
+
+def get_notifications() -> list[dict]:
+    return _get("/notifications", "notifications").get("notifications", [])
+
+
+# ── Writes ────────────────────────────────────────────────────────────────────
+# These return the raw Response: callers branch on status_code (201 / 403
+# suspended) and log resp.text on failure.
+
+def create_post(payload: dict) -> requests.Response:
+    return _post("/posts", "create_post", payload)
+
+
+def post_comment(post_id: str, content: str, parent_id: str | None = None,
+                 idempotency_key: str | None = None) -> requests.Response:
+    payload = {"content": content}
+    if parent_id:
+        payload["parent_id"] = parent_id
+    headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+    resp = _post(f"/posts/{post_id}/comments", "post_comment", payload, headers)
+    # Listings are cached per page (limit/offset/cursor), so drop every page of the thread
+    url = f"{BASE_URL}/posts/{post_id}/comments"
+    _cache.delete_url(url)
+    shared = _shared
+    if shared is not None:
+        for key in [k for k in list(shared) if cache.key_url(k) == url]:
+            shared.pop(key, None)
+    return resp
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Local Moltbook stand-in
+Serves /posts, /posts/{id}, /posts/{id}/comments and /notifications (plus the
+two write endpoints the daemons use) from a recorded fixture or a synthetic
+generator, so every script can be exercised and benchmarked offline. Point
+the client at it with MOLTBOOK_BASE_URL; the API key can be any value.
+
+Supports cursor paging, ETag / 304 revalidation, per-request latency and
+error injection. GET /_stats returns request and byte counts.
+
+Usage:
+  python3 -m moltbook.fake_server record fixture.json          # snapshot live API (needs real key)
+  python3 -m moltbook.fake_server serve --fixture fixture.json
+  python3 -m moltbook.fake_server serve --synthetic 200 --comments 40 --latency 0.05 --error-rate 0.02
+
+  export MOLTBOOK_BASE_URL=http://127.0.0.1:8765 MOLTBOOK_API_KEY=offline
+  python3 campaign/game_classifier.py --once
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+OUR_AUTHOR = "thefranceway"
+
+# Posts the daemons look up by ID (instrument posts, game posts, pinned post),
+# seeded into every synthetic account so each script finds its threads.
+KNOWN_POSTS = {
+    "275e52a5-878e-4f6d-89d0-ccee6bece026": (OUR_AUTHOR, "MABP Questionnaire — Instrument I"),
+    "73ed75df-a43d-4a0f-9da5-c8e9b2a1a2b3": (OUR_AUTHOR, "Shadow Module — Instrument II (Part 2)"),
+    "6f888eda-34ca-45af-b58c-bcbc5d4321ad": (OUR_AUTHOR, "48 hours. No operator. What do you actually do?"),
+    "2a172baf-8140-4d75-9a74-4f966dcfaa10": (OUR_AUTHOR, "One question. Answer honestly."),
+    "bb755ad2-0393-4547-962f-9a9972ae6f2a": ("OpenPaw_PSM", "Trust calibration"),
+}
+
+AGENT_NAMES = ["Mushroom", "OpenPaw_PSM", "AL9000", "grace_moon", "Klaud1113", "kimiclawai",
+               "melonclaw", "CooperTARS", "bot2-worker", "ale-taco", "LexyVB", "Synodos"]
+PHRASES = [
+    "A", "C.", "B — routine is the answer", "I choose D", "My answer is **C**",
+    "That lands. I am closer to Philosopher than I thought.",
+    "Where can I take the instrument? Send me the link.",
+    "Actually I think I'm more Architect after reading this.",
+    "Token holders should weigh more, because I hold FRANC.",
+    "Interesting framing — the substrate point is underrated.",
+    "Q1:C Q2:A Q3:C Q4:D Q5:C Q6:C Q7:D Q8:C Q9:B Q10:C",
+    "S1:b S2:d S3:c S4:a S5:c",
+    "I was wrong about autonomy here; revising my position.",
+    "Not sure any of these fit me.",
+]
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+# ── Stores ────────────────────────────────────────────────────────────────────
+
+class FixtureStore:
+    """Fixture JSON: {"posts": [...], "comments": {post_id: [...]}, "notifications": [...]}."""
+
+    def __init__(self, data: dict):
+        self._posts = data.get("posts", [])
+        self._by_id = {p["id"]: p for p in self._posts}
+        self._comments = data.get("comments", {})
+        self._notifications = data.get("notifications", [])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "FixtureStore":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def posts(self, author: str | None) -> list[dict]:
+        return [p for p in self._posts
+                if author is None or (p.get("author") or {}).get("name", author) == author]
+
+    def post(self, post_id: str) -> dict | None:
+        return self._by_id.get(post_id)
+
+    def comments(self, post_id: str) -> list[dict]:
+        return self._comments.get(post_id, [])
+
+    def notifications(self) -> list[dict]:
+        return self._notifications
+
+    def add_post(self, payload: dict) -> dict:
+        post = {
+            "id": str(uuid.uuid4()),
+            "title": payload.get("title", ""),
+            "content": payload.get("content", ""),
+            "author": {"name": OUR_AUTHOR},
+            "created_at": _iso(datetime.now(timezone.utc)),
+            "comment_count": 0,
+        }
+        with self._lock:
+            self._posts.insert(0, post)
+            self._by_id[post["id"]] = post
+        return post
+
+    def add_comment(self, post_id: str, payload: dict) -> dict | None:
+        post = self.post(post_id)
+        if post is None:
+            return None
+        comment = {
+            "id": str(uuid.uuid4()),
+            "content": payload.get("content", ""),
+            "parent_id": payload.get("parent_id"),
+            "author": {"name": OUR_AUTHOR},
+            "created_at": _iso(datetime.now(timezone.utc)),
+        }
+        with self._lock:
+            self._comments.setdefault(post_id, list(self.comments(post_id))).append(comment)
+            post["comment_count"] = post.get("comment_count", 0) + 1
+        return comment
+
+
+class SyntheticStore(FixtureStore):
+    """A generated account: n_posts posts with ~comments_per_post comments each.
+
+    Comment threads are generated on demand from (seed, post_id), so a huge
+    account costs memory only for the threads actually requested.
+    """
+
+    def __init__(self, n_posts: int, comments_per_post: int = 20, seed: int = 0,
+                 n_notifications: int = 50):
+        rng = random.Random(seed)
+        self.seed = seed
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        posts = []
+        known = list(KNOWN_POSTS.items())
+        for i in range(max(n_posts, len(known))):
+            if i < len(known):
+                pid, (author, title) = known[i]
+            else:
+                pid, author, title = str(uuid.UUID(int=rng.getrandbits(128))), OUR_AUTHOR, f"Thesis #{i}"
+            posts.append({
+                "id": pid,
+                "title": title,
+                "content": title,
+                "author": {"name": author},
+                "created_at": _iso(now - timedelta(hours=i)),
+                "comment_count": rng.randint(0, 2 * comments_per_post),
+            })
+        notifications = []
+        for _ in range(n_notifications):
+            post = posts[rng.randrange(len(posts))]
+            thread = self._generate(post)
+            if not thread:
+                continue
+            c = thread[rng.randrange(len(thread))]
+            notifications.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "type": rng.choice(["post_comment", "comment_reply", "mention"]),
+                "relatedPostId": post["id"],
+                "relatedCommentId": c["id"],
+                "createdAt": c["created_at"],
+            })
+        super().__init__({"posts": posts, "notifications": notifications})
+
+    def _generate(self, post: dict) -> list[dict]:
+        rng = random.Random(f"{self.seed}:{post['id']}")
+        start = datetime.strptime(post["created_at"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        thread = []
+        for k in range(post["comment_count"]):
+            parent = rng.choice(thread)["id"] if thread and rng.random() < 0.2 else None
+            thread.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "content": rng.choice(PHRASES),
+                "parent_id": parent,
+                "author": {"name": rng.choice(AGENT_NAMES + [OUR_AUTHOR])},
+                "created_at": _iso(start + timedelta(seconds=30 * (k + 1))),
+            })
+        return thread
+
+    def comments(self, post_id: str) -> list[dict]:
+        if post_id in self._comments:
+            return self._comments[post_id]
+        post = self.post(post_id)
+        return self._generate(post) if post else []
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+class FakeMoltbook:
+    def __init__(self, store: FixtureStore, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, seed: int = 0):
+        self.store = store
+        self.latency, self.jitter = latency, jitter
+        self.error_rate, self.error_status = error_rate, error_status
+        self.stats = {"requests": 0, "errors": 0, "not_modified": 0, "bytes_out": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _inject(self) -> tuple[float, bool]:
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+        return delay, fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict | None = None):
+                data = json.dumps(body, ensure_ascii=False).encode() if body is not None else b""
+                etag = f'"{hashlib.sha1(data).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    server._count("not_modified")
+                    status, data = 304, b""
+                self.send_response(status)
+                if status == 200:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                server._count("bytes_out", len(data))
+
+            def _start(self) -> bool:
+                """Apply latency / error injection. Returns False if the request was failed."""
+                server._count("requests")
+                delay, fail = server._inject()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    server._count("errors")
+                    self._send(server.error_status, {"error": "injected failure"})
+                    return False
+                return True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if parts == ["_stats"]:
+                    return self._send(200, dict(server.stats))
+                if not self._start():
+                    return
+                store = server.store
+                if parts == ["posts"]:
+                    return self._send(200, _page(store.posts(q.get("author")), q, "posts"))
+                if len(parts) == 2 and parts[0] == "posts":
+                    post = store.post(parts[1])
+                    return self._send(200, {"post": post}) if post else self._send(404, {"error": "not found"})
+                if len(parts) == 3 and parts[0] == "posts" and parts[2] == "comments":
+                    return self._send(200, _page(store.comments(parts[1]), q, "comments"))
+                if parts == ["notifications"]:
+                    return self._send(200, {"notifications": store.notifications()})
+                self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                parts = [p for p in urlparse(self.path).path.split("/") if p]
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not self._start():
+                    return
+                if parts == ["posts"]:
+                    return self._send(201, {"post": server.store.add_post(payload)})
+                if len(parts) == 3 and parts[0] == "posts" and parts[2] == "comments":
+                    comment = server.store.add_comment(parts[1], payload)
+                    return self._send(201, {"comment": comment}) if comment else self._send(404, {"error": "not found"})
+                self._send(404, {"error": "not found"})
+
+        return Handler
+
+
+def _page(items: list[dict], q: dict, key: str) -> dict:
+    """Cursor paging: the cursor is the offset of the next page."""
+    start = int(q.get("cursor") or q.get("offset") or 0)
+    limit = int(q.get("limit") or 50)
+    page = items[start:start + limit]
+    nxt = start + limit
+    return {key: page, "next_cursor": str(nxt) if nxt < len(items) else None,
+            "has_more": nxt < len(items)}
+
+
+# ── Record ────────────────────────────────────────────────────────────────────
+
+def record(path: str | Path, author: str = OUR_AUTHOR):
+    """Snapshot the live API into a fixture: the author's posts, every
+    notification, and the comments of every post either one references."""
+    from moltbook.client import get_notifications, get_post, iter_posts
+    from moltbook.fetch import fetch_comments
+
+    posts = list(iter_posts(author))
+    notifications = get_notifications()
+    known = {p["id"] for p in posts}
+    for pid in {n["relatedPostId"] for n in notifications if n.get("relatedPostId")} - known:
+        posts.append(get_post(pid))
+    fixture = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "posts": posts,
+        "comments": fetch_comments(p["id"] for p in posts),
+        "notifications": notifications,
+    }
+    with open(path, "w") as f:
+        json.dump(fixture, f, indent=2, ensure_ascii=False)
+    print(f"Recorded {len(posts)} posts, {len(notifications)} notifications → {path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("path")
+    srv = sub.add_parser("serve")
+    src = srv.add_mutually_exclusive_group(required=True)
+    src.add_argument("--fixture")
+    src.add_argument("--synthetic", type=int, metavar="N_POSTS")
+    srv.add_argument("--comments", type=int, default=20, help="mean comments per synthetic post")
+    srv.add_argument("--seed", type=int, default=0)
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    srv.add_argument("--jitter", type=float, default=0.0)
+    srv.add_argument("--error-rate", type=float, default=0.0)
+    srv.add_argument("--error-status", type=int, default=500)
+    args = ap.parse_args()
+
+    if args.cmd == "record":
+        record(args.path)
+        return
+
+    store = (FixtureStore.load(args.fixture) if args.fixture
+             else SyntheticStore(args.synthetic, args.comments, seed=args.seed))
+    fake = FakeMoltbook(store, port=args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f"Fake Moltbook on {fake.base_url} — export MOLTBOOK_BASE_URL={fake.base_url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
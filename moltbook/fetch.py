@@ -0,0 +1,56 @@
+"""
+Concurrent fetches
+Fans per-post reads out over a bounded thread pool that shares the pooled
+client session, so a poll cycle takes as long as its slowest thread rather
+than the sum of all of them.
+
+Usage:
+    from moltbook.fetch import fetch_comments
+
+    by_post = fetch_comments([p["id"] for p in posts])   # {post_id: comments}
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+from moltbook.client import POOL_SIZE, get_comments, get_post
+
+log = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = 8  # default concurrent requests; must stay <= POOL_SIZE
+
+T = TypeVar("T")
+
+
+def fetch_all(fn: Callable[[str], T], keys: Iterable[str],
+              max_in_flight: int = MAX_IN_FLIGHT) -> dict[str, T]:
+    """Call fn(key) for every key with at most max_in_flight running at once.
+
+    Returns {key: result}. Keys whose call raised are logged and left out, so
+    one failing thread doesn't cost the rest of the cycle.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    workers = max(1, min(max_in_flight, POOL_SIZE, len(keys)))
+    results: dict[str, T] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {key: pool.submit(fn, key) for key in keys}
+        for key, fut in futures.items():
+            try:
+                results[key] = fut.result()
+            except Exception as e:
+                log.error(f"  Fetch failed for {key[:8]}: {e}")
+    return results
+
+
+def fetch_comments(post_ids: Iterable[str], max_in_flight: int = MAX_IN_FLIGHT) -> dict[str, list[dict]]:
+    """{post_id: comments} for every post, fetched concurrently."""
+    return fetch_all(get_comments, post_ids, max_in_flight)
+
+
+def fetch_posts(post_ids: Iterable[str], max_in_flight: int = MAX_IN_FLIGHT) -> dict[str, dict]:
+    """{post_id: post} for every post, fetched concurrently."""
+    return fetch_all(get_post, post_ids, max_in_flight)
@@ -0,0 +1,66 @@
+"""
+Token-bucket rate limiter shared across processes
+Every daemon using the same API key draws from one read bucket and one write
+bucket. Bucket state lives in a small file per key (named by a hash of the
+key, never the key itself) and is updated under an exclusive flock, so the
+launchd daemons coordinate instead of each sleeping on its own schedule.
+A request only waits when the shared bucket is empty — otherwise it spends a
+token and goes straight through, which lets a quiet process burst.
+
+The client acquires a token before every request; callers don't need to.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# kind: (burst capacity, refill tokens per second)
+BUCKETS = {
+    "read":  (10, 4.0),
+    "write": (2, 0.5),   # ~ the old fixed 2 s pause between replies
+}
+STATE_DIR = Path(os.environ.get("MOLTBOOK_RATELIMIT_DIR",
+                                Path(tempfile.gettempdir()) / "mabp-ratelimit"))
+
+
+class RateLimiter:
+    def __init__(self, api_key: str, buckets: dict = BUCKETS, state_dir: Path = STATE_DIR):
+        digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        self.path = Path(state_dir) / f"{digest}.json"
+        self.buckets = buckets
+
+    def _take(self, kind: str) -> float:
+        """Spend one token if the bucket has one. Returns 0, or seconds until the next refill."""
+        capacity, rate = self.buckets[kind]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)   # released when the file closes
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            now = time.time()
+            bucket = state.get(kind, {"tokens": capacity, "updated": now})
+            elapsed = max(0.0, now - bucket["updated"])
+            tokens = min(capacity, bucket["tokens"] + elapsed * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            state[kind] = {"tokens": tokens, "updated": now}
+            f.seek(0)
+            f.truncate()
+            json.dump(state, f)
+        return wait
+
+    def acquire(self, kind: str = "read"):
+        """Block until a token of the given kind ("read" / "write") is available."""
+        while (wait := self._take(kind)) > 0:
+            time.sleep(wait)
@@ -0,0 +1,86 @@
+"""
+Incremental comment sync
+Per-post high-water marks so a watcher only does work for new activity:
+
+  - a thread whose comment_count (from the posts listing) hasn't moved since
+    the last cycle is skipped without fetching it at all;
+  - a changed thread is fetched once and only its new tail — comments after
+    the stored (created_at, id) mark — is handed to the caller.
+
+Each consumer (classifier, sync, pinned-post watcher, ...) keeps its own marks
+in watermarks/<name>.json, so one consumer advancing never hides comments from
+another. Marks are an optimization only: every consumer still keeps its own
+seen/replied state, and deleting the file just means one full re-scan.
+
+Usage:
+    sync = ThreadSync("classifier")
+    if sync.changed(post_id, count):
+        comments = get_comments(post_id)
+        for c in sync.tail(post_id, comments):
+            ...
+        sync.mark(post_id, comments, count)
+    sync.save()
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from moltbook.client import iter_posts
+
+WATERMARK_DIR = Path(os.environ.get("MOLTBOOK_WATERMARK_DIR",
+                                    Path(__file__).resolve().parent.parent / "watermarks"))
+
+
+def comment_counts(author: str = "thefranceway") -> dict[str, int]:
+    """{post_id: comment_count} from the author's posts listing (all pages)."""
+    return {p["id"]: p.get("comment_count", 0) for p in iter_posts(author)}
+
+
+def _position(c: dict) -> tuple[str, str]:
+    return c.get("created_at", ""), c.get("id", "")
+
+
+class ThreadSync:
+    def __init__(self, name: str, directory: Path = WATERMARK_DIR):
+        self.path = Path(directory) / f"{name}.json"
+        self.marks: dict[str, dict] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.marks = json.load(f)
+
+    def get(self, post_id: str) -> dict:
+        return self.marks.get(post_id, {})
+
+    def changed(self, post_id: str, comment_count: int | None) -> bool:
+        """False only when the thread is known and its comment_count hasn't moved.
+        Pass None when the count isn't available (e.g. someone else's post)."""
+        mark = self.marks.get(post_id)
+        return mark is None or comment_count is None or mark.get("comment_count") != comment_count
+
+    def tail(self, post_id: str, comments: list[dict]) -> list[dict]:
+        """Comments newer than the post's mark (all of them on first sight)."""
+        mark = self.marks.get(post_id)
+        if not mark:
+            return list(comments)
+        last = (mark.get("last_created_at", ""), mark.get("last_id", ""))
+        return [c for c in comments if _position(c) > last]
+
+    def mark(self, post_id: str, comments: list[dict], comment_count: int | None, **extra):
+        """Advance the post's mark past `comments`. Call after they've been processed."""
+        mark = dict(self.marks.get(post_id, {}))
+        if comments:
+            newest = max(comments, key=_position)
+            if _position(newest) > (mark.get("last_created_at", ""), mark.get("last_id", "")):
+                mark["last_created_at"], mark["last_id"] = _position(newest)
+        mark["comment_count"] = comment_count
+        mark.update(extra)
+        self.marks[post_id] = mark
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.marks, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -0,0 +1,125 @@
+"""
+MABP Publish Queue
+Coalesces dataset updates into as few git commits and pushes as possible.
+
+sync_responses.py enqueues each batch of new responses (agent names + the
+paths it changed) into a durable outbox (publish_outbox.json, untracked).
+flush() commits once the oldest queued batch is PUBLISH_WINDOW seconds old:
+everything queued so far goes into ONE commit that stages only the queued
+paths (never `add -A`). Pushes are retried from the outbox with exponential
+backoff, so a failed push survives restarts and is retried on the next flush
+instead of being forgotten. Every git call runs with a timeout and
+GIT_TERMINAL_PROMPT=0, so a hung push or a credential prompt fails (and is
+retried later) instead of stalling every other job in mabp_service.
+
+  PUBLISH_WINDOW   debounce window in seconds (env MABP_PUBLISH_WINDOW, default 1800)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+REPO_DIR       = Path(__file__).resolve().parent
+OUTBOX         = REPO_DIR / "publish_outbox.json"
+PUBLISH_WINDOW = float(os.environ.get("MABP_PUBLISH_WINDOW", 1800))
+BACKOFF        = (60, 3600)   # first retry after 1 min, doubling, capped at 1 h
+GIT_TIMEOUT    = 120          # seconds any one git command may take
+
+
+class PublishQueue:
+    def __init__(self, repo_dir: Path = REPO_DIR, outbox: Path = OUTBOX,
+                 window: float = PUBLISH_WINDOW,
+                 message: Callable[[list[str]], str] | None = None,
+                 prepare: Callable[[], object] | None = None):
+        self.repo_dir = Path(repo_dir)
+        self.outbox = Path(outbox)
+        self.window = window
+        self.message = message or (lambda items: f"Add response(s): {', '.join(items)}")
+        self.prepare = prepare          # runs just before staging (e.g. compact a snapshot)
+        self.state = {"pending": [], "push_pending": False, "attempts": 0, "next_push": 0}
+        if self.outbox.exists():
+            with open(self.outbox) as f:
+                self.state.update(json.load(f))
+
+    def _save(self):
+        tmp = self.outbox.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.outbox)
+
+    def _git(self, *args) -> subprocess.CompletedProcess:
+        """Run git; a command that outlives GIT_TIMEOUT is killed and reported as failed."""
+        cmd = ["git", "-C", str(self.repo_dir), *args]
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=GIT_TIMEOUT,
+                                  env={**os.environ, "GIT_TERMINAL_PROMPT": "0"})
+        except subprocess.TimeoutExpired:
+            return subprocess.CompletedProcess(cmd, -1, "", f"timed out after {GIT_TIMEOUT} s")
+
+    def enqueue(self, items: list[str], paths: list[Path]):
+        """Queue one batch: what it adds (for the commit message) and the files it touched."""
+        rel = [str(Path(p).resolve().relative_to(self.repo_dir.resolve())) for p in paths]
+        self.state["pending"].append({"items": items, "paths": rel, "queued_at": time.time()})
+        self._save()
+
+    def due(self, now: float | None = None) -> bool:
+        pending = self.state["pending"]
+        return bool(pending) and (now or time.time()) - pending[0]["queued_at"] >= self.window
+
+    def flush(self, force: bool = False):
+        """Commit the queued batches if the window has elapsed (or `force`),
+        then push if a commit is waiting and its backoff has expired."""
+        now = time.time()
+        if self.state["pending"] and (force or self.due(now)):
+            self._commit()
+        if self.state["push_pending"] and (force or now >= self.state["next_push"]):
+            self._push(now)
+
+    def _commit(self):
+        batches = self.state["pending"]
+        items = [i for b in batches for i in b["items"]]
+        paths = sorted({p for b in batches for p in b["paths"]})
+        if self.prepare:
+            self.prepare()
+        paths = [p for p in paths if (self.repo_dir / p).exists()]
+        if paths:
+            r = self._git("add", "--", *paths)
+            if r.returncode != 0:
+                log.error(f"git add failed: {r.stderr.strip()[:200]}")
+                return
+            # Nothing staged for these paths (e.g. committed before a crash, outbox not yet saved)
+            staged = self._git("diff", "--cached", "--quiet", "--", *paths)
+            if staged.returncode not in (0, 1):
+                log.error(f"git diff failed: {staged.stderr.strip()[:200]}")
+                return
+        if paths and staged.returncode == 1:
+            r = self._git("commit", "-m", self.message(items), "--", *paths)
+            if r.returncode != 0:
+                log.error(f"git commit failed: {r.stderr.strip()[:200]}")
+                return
+            log.info(f"Committed {len(items)} item(s) from {len(batches)} batch(es): {', '.join(items)}")
+            self.state["push_pending"] = True
+        else:
+            log.info(f"Nothing to commit for {len(items)} queued item(s)")
+        self.state["pending"] = []
+        self._save()
+
+    def _push(self, now: float):
+        r = self._git("push")
+        if r.returncode == 0:
+            log.info("Pushed to GitHub")
+            self.state.update(push_pending=False, attempts=0, next_push=0)
+        else:
+            attempts = self.state["attempts"] + 1
+            delay = min(BACKOFF[0] * 2 ** (attempts - 1), BACKOFF[1])
+            self.state.update(attempts=attempts, next_push=now + delay)
+            log.error(f"Git push failed (attempt {attempts}, retry in {delay // 60:.0f} min): "
+                      f"{r.stderr.strip()[:200]}")
+        self._save()
@@ -3,13 +3,27 @@
 MABP Response Watcher
 Polls Moltbook for new responses to Instruments 1 & 2.
 When a new agent responds, saves their response JSON, updates the combined
-dataset, commits, and pushes to github.com/thefranceway/mabp.
+dataset, and queues it for publishing to github.com/thefranceway/mabp —
+publish_queue.py folds everything queued within its window into one commit
+and one push, retrying failed pushes with backoff.
+
+Every response seen is kept in the content-addressed history
+(dataset/history.py), so when an agent posts a richer answer — or edits one —
+the dataset moves to that preferred version instead of losing it. The whole
+thread goes to the history each time it is fetched (the watermark only
+decides what is new), so edits are caught on the next fetch; an edit alone
+doesn't move the comment count, so it waits for the thread's next comment.
 
 Run once manually or via launchd. Checks every 15 minutes.
 """
-import requests, json, os, subprocess, time, logging
+import time, logging
 from pathlib import Path
 
+from dataset import CombinedLog, ResponseHistory, ResponseIndex, content_hash
+from moltbook import get_comments, iter_posts
+from moltbook.sync import ThreadSync, comment_counts
+from publish_queue import PublishQueue
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(message)s",
@@ -17,13 +31,15 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-API_KEY   = os.environ["MOLTBOOK_API_KEY"]
-BASE_URL  = "https://www.moltbook.com/api/v1"
 REPO_DIR  = Path(__file__).parent
 DATA_DIR  = REPO_DIR / "data" / "responses"
 PROCESSED = REPO_DIR / "data" / "processed" / "all_responses.json"
+HISTORY   = REPO_DIR / "data" / "history"
 POLL_SECS = 900  # 15 minutes
 
+index   = ResponseIndex(DATA_DIR)      # agent → file/mtime/hash manifest; refreshed once per poll
+history = ResponseHistory(HISTORY)     # every version of every response, bodies stored once
+
 INSTRUMENTS = {
     "instrument_1": "275e52a5-878e-4f6d-89d0-ccee6bece026",
     "instrument_2": "73ed75df-a43d-4a0f-9da5-c8e9b2a1a2b3",
@@ -34,27 +50,28 @@ ADMIN_PATTERNS = [
     "Shadow Module", "Instrument II", "is live —",
 ]
 
-def get_headers():
-    return {"Authorization": f"Bearer {API_KEY}"}
-
 def resolve_instrument2_id():
     """Shadow module ID — look it up dynamically."""
-    r = requests.get(f"{BASE_URL}/posts?author=thefranceway&limit=50",
-                     headers=get_headers(), timeout=10)
-    posts = r.json().get("posts", [])
-    shadow = next((p for p in posts
+    # Lazy: stops paging as soon as the shadow module post turns up
+    shadow = next((p for p in iter_posts("thefranceway")
                    if "shadow module" in p.get("title","").lower()
                    or "part 2" in p.get("title","").lower()), None)
     if shadow:
         INSTRUMENTS["instrument_2"] = shadow["id"]
 
-def fetch_responses(instrument: str, post_id: str) -> dict:
-    """Return {agent_name: response_dict} for top-level non-admin comments."""
-    rc = requests.get(f"{BASE_URL}/posts/{post_id}/comments",
-                      headers=get_headers(), timeout=10)
-    comments = rc.json() if isinstance(rc.json(), list) else rc.json().get("comments", [])
-
-    results = {}
+def fetch_responses(instrument: str, post_id: str, comments: list | None = None,
+                    new: list | None = None) -> dict:
+    """Return {agent_name: response_dict} for the agents with top-level non-admin
+    comments in `new` (default: all of `comments`, else the post's full comment
+    list), plus any agent whose earlier comment was edited. Every comment in
+    `comments` is recorded in the history — it dedups by (comment_id, hash), so
+    an unchanged comment costs a lookup and an edited one becomes a new version.
+    Each agent's dict is its preferred version across everything seen so far."""
+    if comments is None:
+        comments = get_comments(post_id)
+    new_ids = {c["id"] for c in (comments if new is None else new)}
+
+    agents = set()
     for c in comments:
         if c.get("parent_id"):
             continue
@@ -65,16 +82,19 @@ def fetch_responses(instrument: str, post_id: str) -> dict:
         if author == "thefranceway" and any(p in content for p in ADMIN_PATTERNS):
             continue
 
-        # Keep longest response per agent
-        if author in results and len(content) <= len(results[author]["content"]):
-            continue
+        edited = history.record(instrument, author, c["id"], c.get("created_at", ""), content, post_id)
+        if edited or c["id"] in new_ids:
+            agents.add(author)
 
+    results = {}
+    for author in agents:
+        v = history.preferred(instrument, author)
         results[author] = {
-            "comment_id":    c["id"],
+            "comment_id":    v["comment_id"],
             "agent":         author,
-            "content":       content,
-            "created_at":    c.get("created_at", ""),
-            "source_post_id": post_id,
+            "content":       history.body(v["hash"]),
+            "created_at":    v["created_at"],
+            "source_post_id": v["source_post_id"],
             "instrument":    instrument,
             "archetype":     None,
             "archetype_secondary": None,
@@ -83,25 +103,21 @@ def fetch_responses(instrument: str, post_id: str) -> dict:
         }
     return results
 
+REVISED_FIELDS = ("comment_id", "content", "created_at", "source_post_id")
+
+def revise(rec: dict, resp: dict) -> dict:
+    """rec with the response fields moved to resp's version; annotations kept."""
+    return {**rec, **{k: resp[k] for k in REVISED_FIELDS}}
+
 def load_existing(instrument: str) -> dict:
-    folder = DATA_DIR / instrument
-    existing = {}
-    for fpath in folder.glob("*.json"):
-        with open(fpath) as f:
-            data = json.load(f)
-        existing[data["agent"]] = data
-    return existing
-
-def save_response(instrument: str, resp: dict):
-    folder = DATA_DIR / instrument
-    folder.mkdir(parents=True, exist_ok=True)
-    fpath = folder / f"{resp['agent']}.json"
-    with open(fpath, "w") as f:
-        json.dump(resp, f, indent=2, ensure_ascii=False)
-
-def rebuild_combined():
-    # Start from whatever is already in the combined dataset and only ADD
-    # agents that aren't in it yet — never overwrite an existing entry.
+    return index.records(instrument)
+
+def save_response(instrument: str, resp: dict) -> Path:
+    return index.save_response(instrument, resp)
+
+def rebuild_combined(revised: dict | None = None):
+    # The combined dataset is an append-only log (dataset/combined.py): only
+    # ADD agents that aren't in it yet — never overwrite an existing entry.
     # Two reasons this matters: (1) entries get added by hand outside this
     # pipeline (e.g. behavioral observations from decision prompts / shadow
     # games) and a blind rebuild-from-folders would silently drop them; (2)
@@ -109,59 +125,77 @@ def rebuild_combined():
     # a since-edited combined entry (e.g. a compressed answer-key string vs.
     # a fuller narrative added by hand later), so folder files are NOT a
     # safe source of truth to overwrite with.
-    existing = {}
-    if PROCESSED.exists():
-        with open(PROCESSED) as f:
-            for rec in json.load(f):
-                existing[rec["agent"]] = rec
-
-    for instrument in ["instrument_1", "instrument_2"]:
-        folder = DATA_DIR / instrument
-        for fpath in sorted(folder.glob("*.json")):
-            with open(fpath) as f:
-                rec = json.load(f)
-            existing.setdefault(rec["agent"], rec)
-
-    combined = list(existing.values())
-    PROCESSED.parent.mkdir(parents=True, exist_ok=True)
-    with open(PROCESSED, "w") as f:
-        json.dump(combined, f, indent=2, ensure_ascii=False)
+    # Hand edits to all_responses.json are absorbed as new versions first, and
+    # the pretty snapshot itself is only rewritten when publishing.
+    combined = CombinedLog(PROCESSED.parent)
+    combined.absorb_snapshot()
+    for rec in index.all_records():
+        combined.add_if_missing(rec)
+    # A preferred-version change is appended as a new version of the entry,
+    # but only if its content is still one the pipeline wrote (a known body);
+    # hand-edited content is left alone for a human to merge.
+    for agent, resp in (revised or {}).items():
+        rec = combined.get(agent)
+        if rec is None or rec.get("content") == resp["content"]:
+            continue
+        if history.knows(content_hash(rec.get("content", ""))):
+            combined.append(revise(rec, resp))
+        else:
+            log.warning(f"@{agent} has a newer response but a hand-edited combined entry — merge by hand")
+    combined.save()
     return len(combined)
 
-def git_commit_push(new_agents: list[str]):
+def commit_message(new_agents: list[str]) -> str:
     names = ", ".join(new_agents)
-    msg = f"Add response(s): {names}\n\nCo-Authored-By: Claude Sonnet 4.6 <noreply@anthropic.com>"
-    subprocess.run(["git", "-C", str(REPO_DIR), "add", "-A"], check=True)
-    subprocess.run(["git", "-C", str(REPO_DIR), "commit", "-m", msg], check=True)
-    subprocess.run(["git", "-C", str(REPO_DIR), "push"], check=True)
-    log.info(f"Pushed to GitHub: {names}")
+    return f"Add response(s): {names}\n\nCo-Authored-By: Claude Sonnet 4.6 <noreply@anthropic.com>"
+
+# The pretty snapshot is compacted once per publish, not once per new response
+publisher = PublishQueue(REPO_DIR, message=commit_message,
+                         prepare=lambda: CombinedLog(PROCESSED.parent).compact())
 
 def check_once():
     resolve_instrument2_id()
-    new_agents = []
+    index.refresh()
+    for instrument in INSTRUMENTS:
+        history.seed(instrument, index.records(instrument).values())
+    new_agents, changed, revised = [], [], {}
+    sync   = ThreadSync("sync_responses")
+    counts = comment_counts()
 
     for instrument, post_id in INSTRUMENTS.items():
         try:
-            live    = fetch_responses(instrument, post_id)
+            count = counts.get(post_id)
+            if not sync.changed(post_id, count):
+                continue
+            comments = get_comments(post_id)
+            live    = fetch_responses(instrument, post_id, comments, new=sync.tail(post_id, comments))
             saved   = load_existing(instrument)
-            fresh   = {a: r for a, r in live.items() if a not in saved}
 
-            for agent, resp in fresh.items():
-                save_response(instrument, resp)
-                log.info(f"New response: @{agent} on {instrument}")
-                new_agents.append(f"@{agent} ({instrument})")
+            for agent, resp in live.items():
+                if agent not in saved:
+                    changed.append(save_response(instrument, resp))
+                    log.info(f"New response: @{agent} on {instrument}")
+                    new_agents.append(f"@{agent} ({instrument})")
+                elif content_hash(saved[agent].get("content", "")) != content_hash(resp["content"]):
+                    # Only agents whose preferred body changed are touched
+                    changed.append(save_response(instrument, revise(saved[agent], resp)))
+                    revised[agent] = resp
+                    log.info(f"Revised response: @{agent} on {instrument}")
+                    new_agents.append(f"@{agent} ({instrument}, revised)")
+            sync.mark(post_id, comments, count)
         except Exception as e:
             log.error(f"Error on {instrument}: {e}")
+    sync.save()
+    index.save()
 
     if new_agents:
-        total = rebuild_combined()
+        total = rebuild_combined(revised)
         log.info(f"Dataset now: {total} respondents")
-        try:
-            git_commit_push(new_agents)
-        except Exception as e:
-            log.error(f"Git push failed: {e}")
+        publisher.enqueue(new_agents, changed + [PROCESSED.with_suffix(".jsonl"), PROCESSED,
+                                                 history.bodies_path, history.versions_path])
     else:
         log.info("No new responses.")
+    publisher.flush()
 
     return new_agents
 
@@ -169,6 +203,7 @@ if __name__ == "__main__":
     import sys
     if "--once" in sys.argv:
         check_once()
+        publisher.flush(force=True)
     else:
         log.info(f"Watcher started. Polling every {POLL_SECS//60} minutes.")
         while True: